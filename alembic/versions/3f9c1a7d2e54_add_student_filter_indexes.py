@@ -0,0 +1,32 @@
+"""Add student filter indexes
+
+Revision ID: 3f9c1a7d2e54
+Revises: b79dbf1bffc3
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a7d2e54'
+down_revision: Union[str, Sequence[str], None] = 'b79dbf1bffc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_students_kelas_id', 'students', ['kelas', 'id'], unique=False)
+    op.create_index('ix_students_kategori_id', 'students', ['kategori', 'id'], unique=False)
+    op.create_index('ix_students_orang_tua_id_id', 'students', ['orang_tua_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_students_orang_tua_id_id', table_name='students')
+    op.drop_index('ix_students_kategori_id', table_name='students')
+    op.drop_index('ix_students_kelas_id', table_name='students')
@@ -0,0 +1,57 @@
+"""Add kelas_stats table
+
+Revision ID: 8d41e6b0c2a9
+Revises: 3f9c1a7d2e54
+Create Date: 2026-10-18 10:02:17.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b0c2a9'
+down_revision: Union[str, Sequence[str], None] = '3f9c1a7d2e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUBJECT_FIELDS = [
+    'al_quran_iqro', 'hafalan_surat_pendek', 'hafalan_doa', 'hafalan_ayat_pilihan',
+    'bahasa_arab', 'bahasa_inggris', 'khat_menulis', 'menggambar_mewarnai',
+    'jasmani_kesehatan', 'kreativitas_keaktifan', 'ulumul_quran', 'kemampuan_berbahasa',
+]
+KATEGORI_LIST = ['BSB', 'BSH', 'MB', 'BB']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'kelas_stats',
+        sa.Column('kelas', sa.String(), nullable=False),
+        sa.Column('jumlah_siswa', sa.Integer(), nullable=False),
+        sa.Column('total_rata_rata', sa.Float(), nullable=False),
+        *[sa.Column(f'total_{field}', sa.Integer(), nullable=False) for field in SUBJECT_FIELDS],
+        *[sa.Column(f'jumlah_{kategori.lower()}', sa.Integer(), nullable=False) for kategori in KATEGORI_LIST],
+        sa.PrimaryKeyConstraint('kelas'),
+    )
+
+    # Isi awal dari data siswa yang sudah ada
+    columns = ['jumlah_siswa', 'total_rata_rata']
+    aggregates = ['COUNT(id)', 'COALESCE(SUM(rata_rata), 0.0)']
+    for field in SUBJECT_FIELDS:
+        columns.append(f'total_{field}')
+        aggregates.append(f'COALESCE(SUM({field}), 0)')
+    for kategori in KATEGORI_LIST:
+        columns.append(f'jumlah_{kategori.lower()}')
+        aggregates.append(f"SUM(CASE WHEN kategori = '{kategori}' THEN 1 ELSE 0 END)")
+    op.execute(
+        f"INSERT INTO kelas_stats (kelas, {', '.join(columns)}) "
+        f"SELECT kelas, {', '.join(aggregates)} FROM students WHERE kelas IS NOT NULL GROUP BY kelas"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('kelas_stats')
@@ -0,0 +1,46 @@
+"""Add prediction_logs table
+
+Revision ID: c52e7f19a4d3
+Revises: 8d41e6b0c2a9
+Create Date: 2026-10-18 11:24:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e7f19a4d3'
+down_revision: Union[str, Sequence[str], None] = '8d41e6b0c2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'prediction_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('endpoint', sa.String(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.Column('inputs', sa.String(), nullable=False),
+        sa.Column('kategori', sa.String(), nullable=False),
+        sa.Column('margin', sa.Float(), nullable=True),
+        sa.Column('model_version', sa.String(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_prediction_logs_created_at', 'prediction_logs', ['created_at'], unique=False)
+    op.create_index('ix_prediction_logs_user_id', 'prediction_logs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_prediction_logs_user_id', table_name='prediction_logs')
+    op.drop_index('ix_prediction_logs_created_at', table_name='prediction_logs')
+    op.drop_table('prediction_logs')
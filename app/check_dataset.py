@@ -1,12 +1,12 @@
 # file: check_dataset.py
-import pandas as pd
+from dataset_cache import load_dataset
 
 def check_dataset(csv_path):
     """
     Cek struktur dan isi dataset
     """
     try:
-        df = pd.read_csv(csv_path)
+        df = load_dataset(csv_path)
         
         print(f"Dataset loaded successfully!")
         print(f"Shape: {df.shape}")
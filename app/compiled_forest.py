@@ -0,0 +1,206 @@
+# file: app/compiled_forest.py
+import json
+import os
+import numpy as np
+
+# Array yang disimpan ke disk untuk format model memory-mapped
+ARRAY_NAMES = ["feature", "threshold", "children", "value", "roots"]
+MANIFEST_NAME = "manifest.json"
+
+class CompiledForest:
+    """
+    RandomForestClassifier yang sudah diratakan menjadi array NumPy.
+
+    Semua node dari semua pohon disimpan dalam satu array (feature, threshold,
+    children, value). Leaf menunjuk ke dirinya sendiri sehingga traversal
+    bisa dilakukan level per level untuk semua baris dan semua pohon sekaligus,
+    tanpa overhead validasi input dan joblib dari model.predict.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] = anak kiri, children[2 * node + 1] = anak kanan
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self._edge_delta = None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Ubah model.estimators_ menjadi array datar"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            # Normalisasi distribusi kelas per node, sama seperti tree.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        children = np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1).ravel()
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=children.astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=model.classes_,
+            n_features=model.n_features_in_,
+        )
+
+    def save(self, directory, version, feature_names):
+        """
+        Simpan array sebagai file .npy + manifest JSON yang bisa di-load dengan mmap.
+
+        Nama file memakai versi model dan ditulis lewat file sementara + os.replace,
+        sehingga worker yang masih me-mmap versi lama tidak pernah membaca file
+        yang sedang ditimpa. Manifest ditulis terakhir sebagai penanda artefak lengkap.
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = {}
+        for name in ARRAY_NAMES:
+            file_name = f"{name}-{version}.npy"
+            tmp_path = os.path.join(directory, file_name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, os.path.join(directory, file_name))
+            files[name] = file_name
+
+        manifest = {
+            "format": "compiled_forest",
+            "format_version": 1,
+            "version": version,
+            "classes": self.classes_.tolist(),
+            "n_features": int(self.n_features_in_),
+            "max_depth": int(self.max_depth),
+            "feature_names": list(feature_names),
+            "files": files,
+        }
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+        # Hapus file versi lama; worker yang masih me-mmap tetap aman karena inode-nya tetap hidup
+        for file_name in os.listdir(directory):
+            if file_name.endswith(".npy") and file_name not in files.values():
+                os.remove(os.path.join(directory, file_name))
+        return manifest_path
+
+    @classmethod
+    def load(cls, manifest_path, mmap_mode="r"):
+        """Load artefak dari manifest; dengan mmap_mode="r" semua worker berbagi page yang sama"""
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != "compiled_forest":
+            raise ValueError(f"Format artefak tidak dikenal: {manifest.get('format')}")
+
+        directory = os.path.dirname(manifest_path)
+        arrays = {
+            name: np.load(os.path.join(directory, file_name), mmap_mode=mmap_mode)
+            for name, file_name in manifest["files"].items()
+        }
+        compiled = cls(
+            **arrays,
+            max_depth=manifest["max_depth"],
+            classes=np.array(manifest["classes"], dtype=object),
+            n_features=manifest["n_features"],
+        )
+        return compiled, manifest
+
+    def apply(self, X):
+        """Index leaf (global) untuk setiap baris dan setiap pohon, shape (n_rows, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, np.newaxis]
+        nodes = np.tile(self.roots, (n_rows, 1))
+
+        for _ in range(self.max_depth):
+            # Sama seperti sklearn: ke kiri jika X <= threshold, selain itu ke kanan
+            values = X_flat.take(row_offsets + self.feature.take(nodes))
+            go_right = ~(values <= self.threshold.take(nodes))
+            nodes = self.children.take(2 * nodes + go_right)
+        return nodes
+
+    def predict_proba(self, X):
+        """Rata-rata distribusi kelas dari semua pohon, sama seperti RandomForestClassifier"""
+        leaf_values = self.value.take(self.apply(X), axis=0)  # (n_rows, n_trees, n_classes)
+        # Dijumlahkan berurutan per pohon agar hasil floating point identik dengan sklearn
+        return leaf_values.sum(axis=1) / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def edge_delta(self):
+        """
+        Tabel kontribusi per cabang, dihitung sekali per model:
+        edge_delta[2 * node + arah] = value[anak] - value[node]. Untuk leaf nilainya
+        nol karena leaf menunjuk ke dirinya sendiri.
+        """
+        if self._edge_delta is None:
+            self._edge_delta = self.value.take(self.children, axis=0) - np.repeat(self.value, 2, axis=0)
+        return self._edge_delta
+
+    def explain(self, X):
+        """
+        Kontribusi setiap fitur ke probabilitas kelas (dekomposisi jalur pohon,
+        pendekatan murah TreeSHAP): setiap cabang yang dilewati menyumbang perubahan
+        distribusi kelasnya ke fitur yang dipakai untuk split.
+        Mengembalikan (proba (n_rows, n_classes), bias (n_classes,),
+        contributions (n_rows, n_features, n_classes)) dengan
+        proba == bias + contributions.sum(axis=1).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        X_flat = X.ravel()
+        edge_delta = self.edge_delta()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * n_features)[:, np.newaxis]
+        nodes = np.tile(self.roots, (n_rows, 1))
+        indices, edges = [], []
+
+        for _ in range(self.max_depth):
+            # Index baris * n_features + fitur split juga menjadi index hasil kontribusi
+            index = row_offsets + self.feature.take(nodes)
+            go_right = ~(X_flat.take(index) <= self.threshold.take(nodes))
+            edge = 2 * nodes + go_right
+            indices.append(index)
+            edges.append(edge)
+            nodes = self.children.take(edge)
+
+        index = np.concatenate(indices, axis=None)
+        deltas = edge_delta.take(np.concatenate(edges, axis=None), axis=0)
+        contributions = np.empty((n_rows * n_features, len(self.classes_)))
+        for k in range(len(self.classes_)):
+            contributions[:, k] = np.bincount(index, weights=deltas[:, k], minlength=n_rows * n_features)
+
+        proba = self.value.take(nodes, axis=0).sum(axis=1) / n_trees
+        bias = self.value.take(self.roots, axis=0).mean(axis=0)
+        return proba, bias, contributions.reshape(n_rows, n_features, -1) / n_trees
+
+def compile_forest(model):
+    """Kompilasi model jika berupa forest sklearn, selain itu kembalikan None"""
+    if not hasattr(model, "estimators_") or not hasattr(model, "classes_"):
+        return None
+    return CompiledForest.from_sklearn(model)
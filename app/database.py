@@ -1,12 +1,172 @@
+import os
+import threading
+from anyio import to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .metrics import instrument_engine
+from .sqlite_tuning import SQLITE_SINGLE_WRITER, SQLITE_TUNING, WriteQueue, apply_sqlite_pragmas
 
-DATABASE_URL = "sqlite:///./sql_app.db"
+# SQLite untuk lokal, PostgreSQL (postgresql://...) untuk production
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+# Mode async: route memakai AsyncSession (aiosqlite / asyncpg).
+# DB_ASYNC=0 memakai engine sync yang dijalankan di threadpool.
+DB_ASYNC = os.getenv("DB_ASYNC", "1") == "1"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+def _engine_options(url):
+    options = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if ":memory:" not in url:
+        options["pool_size"] = DB_POOL_SIZE
+        options["max_overflow"] = DB_MAX_OVERFLOW
+        options["pool_pre_ping"] = not url.startswith("sqlite")
+    return options
+
+def async_database_url(url):
+    """Ubah URL sync menjadi URL dengan driver async"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+# Semua commit dari route SQLite lewat satu antrian penulis (lihat sqlite_tuning.py)
+write_queue = WriteQueue(
+    enabled=DATABASE_URL.startswith("sqlite") and SQLITE_TUNING and SQLITE_SINGLE_WRITER
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+class QueuedAsyncSession(AsyncSession):
+    """AsyncSession yang commit-nya masuk antrian penulis tunggal"""
+
+    async def commit(self):
+        return await write_queue.run(super().commit)
+
+# Engine sync hanya untuk mode DB_ASYNC=0 dan script CLI. Dibuat saat pertama
+# dipakai: mode async PostgreSQL cukup dengan asyncpg, tanpa driver sync (psycopg2).
+_engine = None
+_engine_lock = threading.Lock()
+_sync_sessionmaker = sessionmaker(autocommit=False, autoflush=False)
+
+def get_engine():
+    """Engine sync (dibuat sekali per proses)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+            apply_sqlite_pragmas(_engine)
+            instrument_engine(_engine)
+        return _engine
+
+def SessionLocal():
+    """Session sync, untuk DB_ASYNC=0 dan script CLI"""
+    return _sync_sessionmaker(bind=get_engine())
+
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+    apply_sqlite_pragmas(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=QueuedAsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+Base = declarative_base()
+
+class ThreadedSession:
+    """
+    Session sync dengan interface yang sama seperti AsyncSession (subset yang
+    dipakai route), setiap operasi DB dijalankan di threadpool. Dipakai saat
+    DB_ASYNC=0 sehingga kode route yang sama bisa jalan di kedua mode.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await to_thread.run_sync(lambda: self.sync_session.execute(statement, *args, **kwargs))
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await to_thread.run_sync(lambda: self.sync_session.scalar(statement, *args, **kwargs))
+
+    async def get(self, entity, ident):
+        return await to_thread.run_sync(self.sync_session.get, entity, ident)
+
+    async def delete(self, instance):
+        await to_thread.run_sync(self.sync_session.delete, instance)
+
+    async def commit(self):
+        await write_queue.run(to_thread.run_sync, self.sync_session.commit)
+
+    async def refresh(self, instance):
+        await to_thread.run_sync(self.sync_session.refresh, instance)
+
+    async def stream(self, statement):
+        result = await to_thread.run_sync(self.sync_session.execute, statement)
+        return ThreadedStreamResult(result)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await to_thread.run_sync(lambda: fn(self.sync_session, *args, **kwargs))
+
+    async def close(self):
+        await to_thread.run_sync(self.sync_session.close)
+
+class ThreadedStreamResult:
+    """Padanan AsyncResult untuk ThreadedSession: fetch per partisi di threadpool"""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size=None):
+        while True:
+            partition = await to_thread.run_sync(self._result.fetchmany, size)
+            if not partition:
+                break
+            yield partition
+
+def open_session():
+    """Session untuk request: AsyncSession atau ThreadedSession tergantung DB_ASYNC"""
+    if DB_ASYNC:
+        return AsyncSessionLocal()
+    return ThreadedSession(SessionLocal())
+
+async def _create_all():
+    if DB_ASYNC:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    else:
+        await to_thread.run_sync(lambda: Base.metadata.create_all(bind=get_engine()))
+
+async def init_db():
+    """
+    Buat tabel yang belum ada (models harus sudah di-import) lewat engine yang
+    dipakai route. Aman dipanggil bersamaan dari beberapa worker: jika worker lain
+    membuat tabel yang sama di antara pengecekan dan CREATE TABLE, create_all
+    diulang dan tabel dilewati.
+    """
+    try:
+        await _create_all()
+    except DatabaseError:
+        await _create_all()
+
+def dispose_after_fork():
+    """
+    Dipanggil di worker setelah fork (gunicorn --preload): koneksi pool milik
+    proses master ditinggalkan tanpa ditutup, worker membuka koneksinya sendiri.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,106 @@
+# file: app/dataset_cache.py
+# Cache biner kolumnar untuk dataset CSV (tpq_dataset.csv dan sejenisnya).
+#
+# CSV di-parse sekali lalu disimpan sebagai .npz: kolom angka dengan dtype
+# sekecil mungkin (nilai mata pelajaran uint8) dan kolom teks sebagai kode
+# kategori + daftar kategorinya. Nama file cache memakai hash isi CSV, jadi
+# CSV yang berubah otomatis dikonversi ulang. Dipakai bersama oleh
+# train_model.py, model_search.py, check_dataset.py dan visualize_model.py.
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+# Kosong = folder .dataset_cache di sebelah file CSV
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "")
+
+SCORE_COLUMNS = [
+    'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
+    'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
+    'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa'
+]
+CATEGORY_COLUMNS = ['Kelas', 'Kategori']
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_path(csv_path, digest):
+    directory = DATASET_CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(csv_path)), ".dataset_cache")
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(directory, f"{name}-{digest[:16]}.npz")
+
+def read_csv_compact(csv_path):
+    """Parse CSV langsung ke dtype ringkas; jika data tidak cocok (mis. nilai kosong) pakai dtype bawaan"""
+    dtypes = {column: np.uint8 for column in SCORE_COLUMNS}
+    dtypes.update({column: "category" for column in CATEGORY_COLUMNS})
+    try:
+        df = pd.read_csv(csv_path, dtype=dtypes)
+    except (ValueError, OverflowError):
+        df = pd.read_csv(csv_path)
+
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object:
+            df[column] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            df[column] = pd.to_numeric(series, downcast="unsigned" if series.min() >= 0 else "integer")
+    return df
+
+def save_cache(df, path):
+    arrays = {"__columns__": np.array(df.columns, dtype=str)}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[column] = series.cat.codes.to_numpy()
+            arrays[column + "__categories"] = np.array(series.cat.categories, dtype=str)
+        else:
+            arrays[column] = series.to_numpy()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(path + ".tmp", path)
+
+    # Hapus cache versi lama dari CSV yang sama
+    prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+    for file_name in os.listdir(os.path.dirname(path)):
+        if file_name.startswith(prefix) and file_name.endswith(".npz") and file_name != os.path.basename(path):
+            os.remove(os.path.join(os.path.dirname(path), file_name))
+
+def check_columns(available, columns):
+    missing = [column for column in columns if column not in set(available)]
+    if missing:
+        raise KeyError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+def load_cache(path, columns=None):
+    """Hanya kolom yang diminta yang dibaca dari file .npz"""
+    with np.load(path, allow_pickle=False) as data:
+        selected = data["__columns__"] if columns is None else columns
+        check_columns(data["__columns__"], selected)
+        columns = {}
+        for column in selected:
+            values = data[column]
+            if column + "__categories" in data.files:
+                values = pd.Categorical.from_codes(values, categories=data[column + "__categories"])
+            columns[column] = values
+    return pd.DataFrame(columns)
+
+def load_dataset(csv_path, columns=None):
+    """
+    DataFrame dari CSV lewat cache .npz; konversi hanya saat CSV baru atau berubah.
+    Kolom teks dikembalikan sebagai category, nilai mata pelajaran sebagai uint8.
+    columns membatasi kolom yang di-load (cache tetap menyimpan semua kolom).
+    """
+    path = cache_path(csv_path, file_hash(csv_path))
+    if not os.path.exists(path):
+        df = read_csv_compact(csv_path)
+        save_cache(df, path)
+        if columns is None:
+            return df
+        check_columns(df.columns, columns)
+        return df[list(columns)]
+    return load_cache(path, columns)
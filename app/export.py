@@ -0,0 +1,53 @@
+# file: app/export.py
+import csv
+import io
+import json
+import os
+from .database import open_session
+
+# Jumlah baris per fetch dari server-side cursor dan per chunk response
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+async def iter_partitions(query):
+    """
+    Stream hasil query per partisi dengan yield_per (server-side cursor).
+    Session dibuka sendiri karena generator tetap berjalan setelah route selesai.
+    """
+    db = open_session()
+    try:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions(EXPORT_BATCH_SIZE):
+            yield partition
+    finally:
+        await db.close()
+
+async def ndjson_chunks(columns, partitions):
+    """Satu objek JSON per baris, satu chunk response per partisi"""
+    async for partition in partitions:
+        lines = [json.dumps(dict(zip(columns, row)), ensure_ascii=False) for row in partition]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def csv_chunks(columns, partitions):
+    """CSV dengan header, satu chunk response per partisi"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for partition in partitions:
+        writer.writerows(partition)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def export_chunks(export_format, columns, query):
+    """Generator body StreamingResponse untuk format ndjson atau csv"""
+    partitions = iter_partitions(query)
+    if export_format == "csv":
+        return csv_chunks(columns, partitions)
+    return ndjson_chunks(columns, partitions)
@@ -0,0 +1,23 @@
+# file: app/fast_json.py
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, fallback ke json bawaan (lebih lambat, hasil sama)
+    orjson = None
+
+# Route list (GET /students, /kegiatan, /pengumuman) memilih kolom sebagai tuple
+# lalu encode langsung ke JSON tanpa membuat model Pydantic per baris.
+# 0 = jalur lama lewat response_model.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "1") == "1"
+
+def dumps(data):
+    """Encode ke bytes JSON (UTF-8, tanpa spasi)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+def rows_to_dicts(columns, rows):
+    """Baris hasil select(kolom...) menjadi list dict dengan urutan kolom yang sama"""
+    return [dict(zip(columns, row)) for row in rows]
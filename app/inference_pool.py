@@ -0,0 +1,256 @@
+# file: app/inference_pool.py
+# Inferensi model di process pool terpisah dengan micro-batching.
+#
+# Route /predict dan /predict/batch tidak lagi menjalankan predict di threadpool
+# AnyIO yang dipakai route DB (dan tidak memegang GIL proses utama). Request yang
+# datang saat semua worker sibuk digabung (paling lama INFERENCE_BATCH_WAIT_MS)
+# menjadi satu matrix dan satu pemanggilan predict di worker; saat ada worker
+# menganggur request langsung dikirim sehingga beban rendah tidak menunggu. Setiap worker me-load model sendiri; versi model
+# ikut dikirim per batch sehingga hot-reload di proses utama diikuti worker.
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from . import ml_model
+from .metrics import observe_inference
+
+# Jumlah proses inferensi; 0 = predict di threadpool proses utama seperti sebelumnya
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+# Saat semua worker sibuk, batch dikirim jika sudah berisi N baris atau paling lambat setelah T ms
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "64"))
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", "2"))
+# Maksimal baris yang menunggu atau sedang diproses, lebih dari itu 429
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "2000"))
+# Batas waktu menunggu hasil per request, lebih dari itu 503
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "5"))
+
+class InferenceQueueFull(Exception):
+    """Antrian inferensi penuh, request ditolak sebelum masuk batch"""
+
+class InferenceTimeout(Exception):
+    """Hasil inferensi tidak datang dalam INFERENCE_TIMEOUT_SECONDS"""
+
+def _init_worker():
+    # Model di-load saat worker start, bukan saat batch pertama
+    ml_model.ensure_model_loaded()
+
+def _ping():
+    return os.getpid()
+
+def _run_batch(X, top_k, path, version):
+    """Dijalankan di worker: predict satu batch dengan model versi yang diminta proses utama"""
+    loaded = ml_model.registry.current
+    if loaded is None or (loaded.version, loaded.path) != (version, path):
+        loaded, _ = ml_model.registry.load(path)
+    return ml_model.predict_details(X, loaded, top_k), loaded.version
+
+class InferencePool:
+    """
+    Process pool inferensi dengan micro-batching dan admission control.
+
+    Batch dikumpulkan per (top_k, model) di event loop selama tidak ada worker
+    yang menganggur; satu request tidak pernah dipecah ke dua batch. Slot antrian dihitung per baris dan baru dilepas saat
+    worker selesai, juga untuk request yang sudah timeout, sehingga pool yang
+    lambat tidak menerima pekerjaan tanpa batas. Hanya dipakai dari satu event loop.
+    """
+
+    def __init__(self, workers, batch_size, wait_ms, queue_size, timeout):
+        self.workers = workers
+        self.batch_size = max(batch_size, 1)
+        self.wait = wait_ms / 1000
+        self.capacity = queue_size
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> [(X, future)]
+        self._pending_rows = {}
+        self._flush_handles = {}
+        self.started = False
+        self.running = 0  # batch yang sedang dikerjakan worker
+        self.in_flight = 0
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _get_executor(self):
+        # "spawn" agar worker tidak mewarisi thread dan event loop proses utama
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def start(self):
+        """Jalankan semua worker (dan load modelnya) sekarang, dipanggil warm-up"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for job in [executor.submit(_ping) for _ in range(self.workers)]:
+            job.result()
+        self.started = True
+
+    def _admit(self, n_rows):
+        with self._lock:
+            if self.in_flight + n_rows > self.capacity:
+                self.rejected += 1
+                raise InferenceQueueFull()
+            self.in_flight += n_rows
+            self.requests += 1
+
+    def _release(self, n_rows):
+        with self._lock:
+            self.in_flight -= n_rows
+            self.running -= 1
+
+    def _submit(self, X, key):
+        """Submit satu batch, kembalikan (executor, future)"""
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(_run_batch, X, *key)
+        except BrokenProcessPool:
+            # Worker mati (misalnya OOM); pool dibuat ulang sekali
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(_run_batch, X, *key)
+
+    def _discard_executor(self, executor, wait=False):
+        # Hanya executor yang rusak; yang sudah dibuat ulang batch lain dibiarkan
+        with self._lock:
+            if executor is None or self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _flush(self, key):
+        handle = self._flush_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        entries = self._pending.pop(key, [])
+        n_rows = self._pending_rows.pop(key, 0)
+        if not entries:
+            return
+
+        X = entries[0][0] if len(entries) == 1 else np.concatenate([x for x, _ in entries])
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+        try:
+            executor, job = self._submit(X, key)
+        except Exception as e:
+            self._release(n_rows)
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += n_rows
+        job.add_done_callback(lambda _: self._release(n_rows))
+        asyncio.wrap_future(job).add_done_callback(lambda done: self._deliver(done, entries, started, executor))
+
+    def _deliver(self, done, entries, started, executor):
+        observe_inference("pool", time.perf_counter() - started)
+        if done.cancelled() or done.exception() is not None:
+            error = InferenceTimeout() if done.cancelled() else done.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._discard_executor(executor)
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        details, version = done.result()
+        offset = 0
+        for X, future in entries:
+            if not future.done():
+                future.set_result((details[offset:offset + len(X)], version))
+            offset += len(X)
+
+    async def predict(self, X, loaded, top_k=0):
+        """Predict matrix X (lihat ml_model.predict_details); mengembalikan (list detail, versi model)"""
+        n_rows = len(X)
+        self._admit(n_rows)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (top_k, loaded.path, loaded.version)
+        self._pending.setdefault(key, []).append((X, future))
+        self._pending_rows[key] = self._pending_rows.get(key, 0) + n_rows
+        if self._pending_rows[key] >= self.batch_size or self.wait <= 0 or self.running < self.workers:
+            self._flush(key)
+        elif key not in self._flush_handles:
+            self._flush_handles[key] = loop.call_later(self.wait, self._flush, key)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise InferenceTimeout()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "started": self.started,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self):
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        # Batch inferensi singkat, tunggu worker berhenti agar tidak ada proses yang tertinggal
+        self._discard_executor(self._executor, wait=True)
+
+inference_pool = InferencePool(
+    INFERENCE_WORKERS, INFERENCE_BATCH_MAX_SIZE, INFERENCE_BATCH_WAIT_MS,
+    INFERENCE_QUEUE_SIZE, INFERENCE_TIMEOUT_SECONDS,
+)
+
+async def _current_model():
+    # Sebelum warm-up selesai load model tidak boleh memblokir event loop
+    return ml_model.registry.current or await run_in_threadpool(ml_model.current_model)
+
+async def predict_performance_details(scores, top_k=0):
+    """Padanan ml_model.predict_performance_details lewat pool; cache tetap di proses utama"""
+    if not inference_pool.enabled:
+        return await run_in_threadpool(ml_model.predict_performance_details, scores, top_k)
+    scores = tuple(scores)
+    loaded = await _current_model()
+    cache_key = (loaded.version, scores)
+    if not top_k:
+        cached = ml_model.prediction_cache.get(cache_key)
+        if cached is not None:
+            return cached, loaded.version
+
+    details, version = await inference_pool.predict(np.array([scores], dtype=np.float32), loaded, top_k)
+    if not top_k and version == loaded.version:
+        ml_model.prediction_cache.put(cache_key, details[0])
+    return details[0], version
+
+async def predict_performance_batch_details(score_rows, top_k=0):
+    """Padanan ml_model.predict_performance_batch_details lewat pool"""
+    if not inference_pool.enabled:
+        return await run_in_threadpool(ml_model.predict_performance_batch_details, score_rows, top_k)
+    loaded = await _current_model()
+    X = ml_model.scores_to_matrix(score_rows)
+    if len(X) == 0:
+        return [], loaded.version
+    return await inference_pool.predict(X, loaded, top_k)
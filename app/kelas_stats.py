@@ -0,0 +1,219 @@
+# file: app/kelas_stats.py
+# Agregat per kelas yang diperbarui secara inkremental.
+#
+# Setiap flush yang menambah, mengubah atau menghapus Student menghitung selisih
+# (jumlah siswa, total nilai per mapel, jumlah per kategori) dan menerapkannya
+# ke tabel kelas_stats di transaksi yang sama, dengan UPDATE kolom = kolom + delta.
+# Kontribusi lama diambil dari baris students yang tersimpan saat flush (dikunci
+# sampai commit), bukan dari nilai yang dibaca request sebelumnya: dua PUT
+# bersamaan pada siswa yang sama tidak mengurangi kontribusi lama dua kali.
+# Insert lewat bulk_insert_mappings memanggil deltas_for_mappings + apply_deltas
+# sendiri. Perubahan lewat bulk UPDATE/DELETE SQL tidak terdeteksi, gunakan rebuild.
+#
+# Rebuild dari tabel students:   python -m app.kelas_stats rebuild
+# Cek konsistensi (exit 1 jika beda): python -m app.kelas_stats check
+import sys
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from . import models
+
+SUBJECT_FIELDS = [
+    "al_quran_iqro", "hafalan_surat_pendek", "hafalan_doa", "hafalan_ayat_pilihan",
+    "bahasa_arab", "bahasa_inggris", "khat_menulis", "menggambar_mewarnai",
+    "jasmani_kesehatan", "kreativitas_keaktifan", "ulumul_quran", "kemampuan_berbahasa",
+]
+KATEGORI_LIST = ["BSB", "BSH", "MB", "BB"]
+TRACKED_FIELDS = ["kelas", "rata_rata", "kategori", *SUBJECT_FIELDS]
+
+STATS_COLUMNS = [
+    "jumlah_siswa",
+    "total_rata_rata",
+    *[f"total_{field}" for field in SUBJECT_FIELDS],
+    *[f"jumlah_{kategori.lower()}" for kategori in KATEGORI_LIST],
+]
+
+stats_table = models.KelasStats.__table__
+
+def student_contribution(values):
+    """Kontribusi satu siswa ke agregat kelasnya; values(nama_kolom) -> nilai"""
+    contribution = {"jumlah_siswa": 1, "total_rata_rata": values("rata_rata") or 0.0}
+    for field in SUBJECT_FIELDS:
+        contribution[f"total_{field}"] = values(field) or 0
+    if values("kategori") in KATEGORI_LIST:
+        contribution[f"jumlah_{values('kategori').lower()}"] = 1
+    return contribution
+
+def _add(deltas, kelas, contribution, sign):
+    if kelas is None:
+        return
+    delta = deltas.setdefault(kelas, {})
+    for column, value in contribution.items():
+        delta[column] = delta.get(column, 0) + sign * value
+
+def _locked_rows(connection, ids):
+    """
+    Nilai TRACKED_FIELDS yang tersimpan untuk siswa ids, dikunci sampai transaksi
+    selesai sehingga penulis lain menunggu dan membaca nilai setelah commit ini.
+    """
+    student = models.Student.__table__
+    query = select(student.c.id, *[student.c[name] for name in TRACKED_FIELDS]).where(student.c.id.in_(ids))
+    if connection.dialect.name == "sqlite":
+        # SQLite tidak punya SELECT ... FOR UPDATE; UPDATE tanpa perubahan mengambil write lock database
+        connection.execute(update(student).where(student.c.id.in_(ids)).values(id=student.c.id))
+    else:
+        query = query.order_by(student.c.id).with_for_update()
+    return {row.id: row._mapping for row in connection.execute(query)}
+
+def _ensure_row(connection, kelas):
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        exists = connection.scalar(select(stats_table.c.kelas).where(stats_table.c.kelas == kelas))
+        if exists is None:
+            connection.execute(insert(stats_table).values(kelas=kelas))
+        return
+    connection.execute(dialect_insert(stats_table).values(kelas=kelas).on_conflict_do_nothing())
+
+def apply_deltas(connection, deltas):
+    for kelas, delta in deltas.items():
+        delta = {column: value for column, value in delta.items() if value}
+        if not delta:
+            continue
+        _ensure_row(connection, kelas)
+        connection.execute(
+            update(stats_table)
+            .where(stats_table.c.kelas == kelas)
+            .values({stats_table.c[column]: stats_table.c[column] + value for column, value in delta.items()})
+        )
+
+def deltas_for_mappings(mappings):
+    """Delta untuk baris yang di-insert lewat bulk_insert_mappings (tidak melewati before_flush)"""
+    deltas = {}
+    for mapping in mappings:
+        _add(deltas, mapping.get("kelas"), student_contribution(mapping.get), 1)
+    return deltas
+
+@event.listens_for(Session, "before_flush")
+def _update_kelas_stats(session, flush_context, instances):
+    deltas = {}
+    for student in session.new:
+        if isinstance(student, models.Student):
+            _add(deltas, student.kelas, student_contribution(lambda name: getattr(student, name)), 1)
+
+    deleted = [student for student in session.deleted if isinstance(student, models.Student)]
+    changed = [
+        student for student in session.dirty
+        if isinstance(student, models.Student)
+        and any(inspect(student).attrs[name].history.has_changes() for name in TRACKED_FIELDS)
+    ]
+    stored = {}
+    if deleted or changed:
+        stored = _locked_rows(session.connection(), [student.id for student in deleted + changed])
+
+    # Baris yang sudah dihapus request lain dilewati; DELETE/UPDATE ORM-nya gagal (StaleDataError)
+    for student in deleted:
+        row = stored.get(student.id)
+        if row is not None:
+            _add(deltas, row["kelas"], student_contribution(row.get), -1)
+
+    for student in changed:
+        row = stored.get(student.id)
+        if row is None:
+            continue
+        state = inspect(student)
+        # UPDATE hanya menulis kolom yang berubah, kolom lain tetap nilai yang tersimpan
+        def new_value(name, state=state, student=student, row=row):
+            return getattr(student, name) if state.attrs[name].history.has_changes() else row[name]
+        _add(deltas, row["kelas"], student_contribution(row.get), -1)
+        _add(deltas, new_value("kelas"), student_contribution(new_value), 1)
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def aggregate_query():
+    """Agregat penuh dari tabel students, urutan kolom sama dengan STATS_COLUMNS"""
+    student = models.Student
+    return (
+        select(
+            student.kelas,
+            func.count(student.id),
+            func.coalesce(func.sum(student.rata_rata), 0.0),
+            *[func.coalesce(func.sum(getattr(student, field)), 0) for field in SUBJECT_FIELDS],
+            *[func.sum(case((student.kategori == kategori, 1), else_=0)) for kategori in KATEGORI_LIST],
+        )
+        .where(student.kelas.isnot(None))
+        .group_by(student.kelas)
+    )
+
+def rebuild(session):
+    """Hitung ulang seluruh kelas_stats dari tabel students (satu INSERT ... SELECT)"""
+    session.execute(delete(stats_table))
+    session.execute(insert(stats_table).from_select(["kelas", *STATS_COLUMNS], aggregate_query()))
+
+def ensure_built(session):
+    """Isi kelas_stats jika tabelnya baru dibuat sementara data siswa sudah ada"""
+    has_stats = session.scalar(select(stats_table.c.kelas).limit(1)) is not None
+    has_students = session.scalar(select(models.Student.id).limit(1)) is not None
+    if has_students and not has_stats:
+        rebuild(session)
+        session.commit()
+
+def check(session, tolerance=1e-6):
+    """Bandingkan kelas_stats dengan perhitungan ulang penuh, kembalikan daftar perbedaan"""
+    expected = {row[0]: dict(zip(STATS_COLUMNS, row[1:])) for row in session.execute(aggregate_query())}
+    stored = {
+        row.kelas: {column: getattr(row, column) for column in STATS_COLUMNS}
+        for row in session.execute(select(stats_table))
+        if row.jumlah_siswa != 0 or row.kelas in expected
+    }
+
+    mismatches = []
+    for kelas in sorted(set(expected) | set(stored)):
+        if kelas not in stored or kelas not in expected:
+            mismatches.append(f"{kelas}: hanya ada di {'students' if kelas in expected else 'kelas_stats'}")
+            continue
+        for column in STATS_COLUMNS:
+            want, got = expected[kelas][column], stored[kelas][column]
+            if abs(want - got) > tolerance * max(1.0, abs(want)):
+                mismatches.append(f"{kelas}.{column}: tersimpan {got}, seharusnya {want}")
+    return mismatches
+
+def summary(stats):
+    """Rata-rata kelas, distribusi kategori dan rata-rata per mapel dari satu baris KelasStats"""
+    jumlah = stats.jumlah_siswa
+    return {
+        "kelas": stats.kelas,
+        "jumlah_siswa": jumlah,
+        "rata_rata": round(stats.total_rata_rata / jumlah, 2),
+        "distribusi_kategori": {
+            kategori: getattr(stats, f"jumlah_{kategori.lower()}") for kategori in KATEGORI_LIST
+        },
+        "rata_rata_mapel": {
+            field: round(getattr(stats, f"total_{field}") / jumlah, 2) for field in SUBJECT_FIELDS
+        },
+    }
+
+if __name__ == "__main__":
+    from .database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    db = SessionLocal()
+    try:
+        if command == "rebuild":
+            rebuild(db)
+            db.commit()
+            print("kelas_stats berhasil dibangun ulang")
+        elif command == "check":
+            mismatches = check(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print("kelas_stats konsisten" if not mismatches else f"{len(mismatches)} perbedaan ditemukan")
+            sys.exit(1 if mismatches else 0)
+        else:
+            print("Penggunaan: python -m app.kelas_stats [rebuild|check]")
+            sys.exit(2)
+    finally:
+        db.close()
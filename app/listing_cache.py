@@ -0,0 +1,112 @@
+# file: app/listing_cache.py
+import hashlib
+import os
+import threading
+import time
+from .lru_cache import LRUCache
+
+# Cache respons GET /kegiatan dan /pengumuman per worker (0 = nonaktif, ETag tetap dikirim).
+LISTING_CACHE_SIZE = int(os.getenv("LISTING_CACHE_SIZE", "256"))
+LISTING_CACHE_TTL_SECONDS = float(os.getenv("LISTING_CACHE_TTL_SECONDS", "30"))
+# Folder file generation yang dibagi semua worker: invalidasi di satu worker menimpa
+# file ini dan worker lain mengosongkan cache-nya pada get() berikutnya
+LISTING_GENERATION_DIR = os.getenv("LISTING_GENERATION_DIR", os.path.dirname(__file__))
+
+class CachedListing:
+    """Body JSON yang sudah diserialisasi beserta strong ETag-nya"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+class ListingCache:
+    """
+    Cache list untuk satu resource dengan key filter kelas (None = semua kelas).
+
+    Setiap create/update/delete memanggil invalidate() setelah commit. Generation
+    dinaikkan saat invalidasi, sehingga hasil query yang dimulai sebelum perubahan
+    tidak pernah disimpan ke cache.
+
+    Dengan shared_file, invalidate() juga menimpa file tersebut. get() dan put()
+    membandingkan stat file dengan yang terakhir dilihat; jika berubah (worker lain
+    melakukan invalidasi) cache dikosongkan dan generation dinaikkan di worker ini.
+    """
+
+    def __init__(self, max_size, ttl_seconds, shared_file=None):
+        self._cache = LRUCache(max_size, ttl_seconds)
+        self._lock = threading.Lock()
+        self._shared_file = shared_file
+        self._shared_stamp = self._read_stamp()
+        self.generation = 0
+
+    def _read_stamp(self):
+        """Identitas versi shared_file saat ini, None jika belum pernah ditulis"""
+        if self._shared_file is None:
+            return None
+        try:
+            st = os.stat(self._shared_file)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _sync(self):
+        """Kosongkan cache jika worker lain sudah menimpa shared_file; dipanggil dengan lock"""
+        stamp = self._read_stamp()
+        if stamp != self._shared_stamp:
+            self._shared_stamp = stamp
+            self.generation += 1
+            self._cache.clear()
+
+    def get(self, key):
+        if self._shared_file is not None:
+            with self._lock:
+                self._sync()
+        return self._cache.get(key)
+
+    def put(self, key, generation, body):
+        listing = CachedListing(body)
+        with self._lock:
+            if self._shared_file is not None:
+                self._sync()
+            if generation == self.generation:
+                self._cache.put(key, listing)
+        return listing
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._cache.clear()
+            if self._shared_file is not None:
+                self._publish()
+
+    def _publish(self):
+        # Isi file selalu berbeda (pid + waktu) dan os.replace membuat inode baru,
+        # sehingga stat berubah walaupun dua invalidasi terjadi di tick mtime yang sama
+        temp_file = f"{self._shared_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "w") as f:
+                f.write(f"{os.getpid()} {time.time_ns()}\n")
+            os.replace(temp_file, self._shared_file)
+        except OSError as e:
+            print(f"Gagal menulis {self._shared_file}: {e}")
+        self._shared_stamp = self._read_stamp()
+
+    def stats(self):
+        return self._cache.stats()
+
+def etag_matches(if_none_match, etag):
+    """True jika header If-None-Match memuat etag atau "*" (perbandingan lemah, RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+kegiatan_cache = ListingCache(LISTING_CACHE_SIZE, LISTING_CACHE_TTL_SECONDS,
+                              shared_file=os.path.join(LISTING_GENERATION_DIR, ".kegiatan_generation"))
+pengumuman_cache = ListingCache(LISTING_CACHE_SIZE, LISTING_CACHE_TTL_SECONDS,
+                                shared_file=os.path.join(LISTING_GENERATION_DIR, ".pengumuman_generation"))
@@ -1,15 +1,28 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from .database import Base, engine, SessionLocal
-from . import models, auth
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import FastAPI, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from .database import open_session, write_queue
+from .export import EXPORT_MEDIA_TYPES, export_chunks
+from . import models, auth, fast_json, kelas_stats, metrics, prediction_log
+from .password_pool import PasswordPoolFull, PasswordPoolTimeout, password_pool
+from .inference_pool import InferenceQueueFull, InferenceTimeout, inference_pool
+from . import inference_pool as pooled
+from .principal import Principal, user_cache
+from .listing_cache import etag_matches, kegiatan_cache, pengumuman_cache
+from .startup import lifespan, readiness
 from pydantic import BaseModel
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from typing import List
-from .ml_model import predict_performance
-from typing import List
+from typing import Dict, List, Optional
+import time
+from .ml_model import (
+    predict_performance_batch, prediction_cache, registry, resolve_model_path, PREDICT_BATCH_MAX_SIZE, SUBJECT_FIELDS,
+)
 
 # Untuk menjalankan server local menggunakan uvicorn 
 # uvicorn app.main:app --reload
@@ -17,17 +30,18 @@ from typing import List
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
-models.Base.metadata.create_all(bind=engine)
+# create_all, load model dan warm-up dijalankan di lifespan (lihat startup.py)
+app = FastAPI(lifespan=lifespan)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
-app = FastAPI()
-
-# Dependency DB
-def get_db():
-    db = SessionLocal()
+# Dependency DB (AsyncSession, atau session sync di threadpool jika DB_ASYNC=0)
+async def get_db():
+    db = open_session()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
 # Schemas
 class UserCreate(BaseModel):
@@ -77,6 +91,52 @@ class StudentResponse(StudentBase):
     class Config:
         orm_mode = True
 
+class StudentImportError(BaseModel):
+    row: int  # Nomor baris di file (header = baris 1)
+    errors: List[str]
+
+class StudentImportPrediction(BaseModel):
+    row: int
+    kategori: str
+
+class StudentImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[StudentImportError]
+    predictions: Optional[List[StudentImportPrediction]] = None
+    model_version: Optional[str] = None
+
+# Item list siswa; dengan parameter fields= hanya kolom yang diminta yang dikirim
+class StudentListItem(BaseModel):
+    id: int
+    name: Optional[str] = None
+    kelas: Optional[str] = None
+    tanggal_lahir: Optional[str] = None
+    jenis_kelamin: Optional[str] = None
+    no_hp: Optional[str] = None
+    nama_orang_tua: Optional[str] = None
+    al_quran_iqro: Optional[int] = None
+    hafalan_surat_pendek: Optional[int] = None
+    hafalan_doa: Optional[int] = None
+    hafalan_ayat_pilihan: Optional[int] = None
+    bahasa_arab: Optional[int] = None
+    bahasa_inggris: Optional[int] = None
+    khat_menulis: Optional[int] = None
+    menggambar_mewarnai: Optional[int] = None
+    jasmani_kesehatan: Optional[int] = None
+    kreativitas_keaktifan: Optional[int] = None
+    ulumul_quran: Optional[int] = None
+    kemampuan_berbahasa: Optional[int] = None
+    rata_rata: Optional[float] = None
+    kategori: Optional[str] = None
+    orang_tua_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+STUDENT_FIELDS = list(StudentListItem.__fields__)
+STUDENTS_PAGE_MAX_LIMIT = 1000
+
 class PredictRequest(BaseModel):
     al_quran_iqro: int
     hafalan_surat_pendek: int
@@ -91,8 +151,52 @@ class PredictRequest(BaseModel):
     ulumul_quran: int
     kemampuan_berbahasa: int
 
+class FeatureContribution(BaseModel):
+    fitur: str
+    kontribusi: float  # Tambahan probabilitas kategori dari nilai fitur ini (bisa negatif)
+
 class PredictResponse(BaseModel):
     kategori: str
+    model_version: str
+    probabilities: Dict[str, float]
+    margin: float  # Selisih probabilitas dua kategori teratas, kecil = siswa di perbatasan
+    # Hanya jika explain=true: probabilitas awal kategori + kontribusi fitur terbesar
+    baseline: Optional[float] = None
+    contributions: Optional[List[FeatureContribution]] = None
+
+class PredictBatchRequest(BaseModel):
+    items: List[PredictRequest] = []  # Nilai yang dikirim langsung
+    student_ids: List[int] = []  # ID siswa yang nilainya diambil dari tabel students
+
+class PredictBatchItem(BaseModel):
+    student_id: Optional[int] = None
+    kategori: str
+    probabilities: Dict[str, float]
+    margin: float
+    baseline: Optional[float] = None
+    contributions: Optional[List[FeatureContribution]] = None
+
+class PredictBatchResponse(BaseModel):
+    results: List[PredictBatchItem]
+    model_version: str
+
+class ModelReloadRequest(BaseModel):
+    path: Optional[str] = None  # Relatif terhadap MODEL_DIR, kosong = file model yang sedang aktif
+
+class ModelInfoResponse(BaseModel):
+    version: str
+    path: str
+    mtime: float
+
+class ModelReloadResponse(ModelInfoResponse):
+    reloaded: bool
+
+class KelasStatsResponse(BaseModel):
+    kelas: str
+    jumlah_siswa: int
+    rata_rata: float
+    distribusi_kategori: Dict[str, int]
+    rata_rata_mapel: Dict[str, float]
 
 # Kegiatan schemas
 class KegiatanBase(BaseModel):
@@ -122,6 +226,8 @@ class KegiatanListResponse(BaseModel):
     class Config:
         orm_mode = True
 
+KEGIATAN_FIELDS = list(KegiatanResponse.__fields__)
+
 # Pengumuman schemas
 class PengumumanBase(BaseModel):
     nama_pengumuman: str
@@ -150,9 +256,11 @@ class PengumumanListResponse(BaseModel):
     class Config:
         orm_mode = True
 
+PENGUMUMAN_FIELDS = list(PengumumanResponse.__fields__)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+
+def decode_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Tidak dapat memvalidasi token",
@@ -160,16 +268,37 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
     try:
         payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    payload = decode_token(token)
+    username = payload["sub"]
+
+    # User yang sama biasanya request berkali-kali; cache menghindari query users di setiap request
+    principal = user_cache.get(username)
+    if principal is None:
+        user = await db.scalar(select(models.User).where(models.User.username == username))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Tidak dapat memvalidasi token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal.from_user(user)
+        user_cache.put(username, principal)
+    return principal
+
+async def get_token_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Principal dari klaim token saja (sub, role, uid) tanpa akses DB.
+    Untuk endpoint yang tidak menyentuh data user, misalnya /predict.
+    Perubahan role baru berlaku setelah token kedaluwarsa.
+    """
+    return Principal.from_claims(decode_token(token))
 
 def calculate_average_and_category(student_data):
     """
@@ -207,38 +336,59 @@ def calculate_average_and_category(student_data):
     return round(rata_rata, 2), kategori
 
 
+async def run_password_job(job):
+    """
+    Jalankan hash/verify bcrypt di password pool, pool penuh = 429, terlalu lama
+    atau worker mati saat mengerjakan request ini = 503 (pool dibuat ulang).
+    """
+    try:
+        return await job
+    except PasswordPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Terlalu banyak permintaan login, coba lagi sebentar",
+            headers={"Retry-After": "1"},
+        )
+    except (PasswordPoolTimeout, BrokenProcessPool):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server sedang sibuk, coba lagi sebentar",
+            headers={"Retry-After": "5"},
+        )
+
 # Register
 @app.post("/register")
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(models.User).where(models.User.username == user.username))
     if db_user:
         raise HTTPException(status_code=400, detail="Username sudah terdaftar")
-    hashed_password = auth.get_password_hash(user.password)
+    # bcrypt berat di CPU, dijalankan di process pool terpisah (lihat password_pool.py)
+    hashed_password = await run_password_job(password_pool.hash(user.password))
     new_user = models.User(username=user.username, hashed_password=hashed_password, role=user.role)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return {"message": "Registrasi berhasil"}
 
 # Login
 @app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(models.User).where(models.User.username == form_data.username))
+    if not user or not await run_password_job(password_pool.verify(form_data.password, user.hashed_password)):
         raise HTTPException(status_code=400, detail="Login gagal")
     
-    access_token = auth.create_access_token(data={"sub": user.username, "role": user.role})
+    access_token = auth.create_access_token(data={"sub": user.username, "role": user.role, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/me", response_model=UserResponse)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 
 
 # Fungsi untuk membuat data siswa
 @app.post("/students", response_model=StudentResponse)
-def create_student(student: StudentCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def create_student(student: StudentCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa menambah data siswa")
     
@@ -252,28 +402,134 @@ def create_student(student: StudentCreate, db: Session = Depends(get_db), curren
     
     new_student = models.Student(**student_dict)
     db.add(new_student)
-    db.commit()
-    db.refresh(new_student)
+    await db.commit()
+    await db.refresh(new_student)
     return new_student
 
-# Fungsi untuk mengambil semua data siswa
-@app.get("/students", response_model=List[StudentResponse])
-def get_students(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.Student).all()
+# Import siswa massal dari CSV/Excel .xlsx (layout tpq_dataset.csv), lihat student_import.py.
+# Baris yang tidak valid dilaporkan per baris tanpa membatalkan baris lain.
+@app.post("/students/import", response_model=StudentImportResponse, response_model_exclude_none=True)
+async def import_students(
+    file: UploadFile = File(...),
+    orang_tua_id: Optional[int] = Query(None, description="Orang tua default jika file tidak punya kolom Orang_Tua_ID"),
+    predict: bool = Query(False, description="Sertakan prediksi model untuk setiap siswa yang diimport"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa import data siswa")
+
+    # Di-import saat dipakai karena menarik pandas (biasanya sudah dimuat oleh warm-up)
+    from . import student_import
+
+    data = await file.read()
+    try:
+        df = await run_in_threadpool(student_import.read_table, data, file.filename or "")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"File tidak bisa dibaca: {e}")
+
+    referenced = student_import.parent_ids_in(df) | ({orang_tua_id} if orang_tua_id is not None else set())
+    result = await db.execute(select(models.User.id).where(models.User.id.in_(referenced)))
+    known_user_ids = set(result.scalars())
+    try:
+        mappings, row_numbers, scores, row_errors = await run_in_threadpool(
+            student_import.prepare_rows, df, orang_tua_id, known_user_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Satu transaksi per chunk, lewat antrian penulis yang sama dengan commit lain
+    imported = []
+    for start, chunk in student_import.chunks(mappings):
+        error = await write_queue.run(db.run_sync, student_import.save_chunk, chunk)
+        if error:
+            student_import.chunk_failed(row_errors, row_numbers, start, len(chunk), error)
+        else:
+            imported.extend(range(start, start + len(chunk)))
+
+    response = {"imported": len(imported), "failed": len(row_errors), "errors": row_errors}
+    if predict and imported:
+        predictions, model_version = await run_in_threadpool(predict_performance_batch, scores[imported])
+        response["predictions"] = [
+            {"row": row_numbers[index], "kategori": kategori} for index, kategori in zip(imported, predictions)
+        ]
+        response["model_version"] = model_version
+    return response
+
+# Fungsi untuk mengambil data siswa dengan filter, keyset pagination dan projection kolom
+# Halaman berikutnya: kirim nilai header X-Next-Cursor sebagai parameter cursor
+@app.get("/students", response_model=List[StudentListItem], response_model_exclude_unset=True)
+async def get_students(
+    response: Response,
+    kelas: Optional[str] = None,
+    kategori: Optional[str] = None,
+    orang_tua_id: Optional[int] = None,
+    cursor: Optional[int] = Query(None, description="ID siswa terakhir dari halaman sebelumnya"),
+    limit: Optional[int] = Query(None, ge=1, le=STUDENTS_PAGE_MAX_LIMIT),
+    fields: Optional[str] = Query(None, description="Kolom yang diambil, dipisah koma (contoh: id,name,kategori)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # Orang tua hanya boleh melihat data anaknya sendiri
+    if current_user.role == "orang_tua":
+        orang_tua_id = current_user.id
+
+    selected = None
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        invalid = [field for field in selected if field not in STUDENT_FIELDS]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Kolom tidak dikenal: {', '.join(invalid)}")
+        # id selalu diambil karena dipakai sebagai cursor
+        selected = ["id"] + [field for field in selected if field != "id"]
+    elif fast_json.FAST_JSON_RESPONSES:
+        # Jalur cepat: kolom sebagai tuple, bukan objek ORM
+        selected = STUDENT_FIELDS
+    if selected is not None:
+        query = select(*[getattr(models.Student, field) for field in selected])
+    else:
+        query = select(models.Student)
+
+    if kelas is not None:
+        query = query.where(models.Student.kelas == kelas)
+    if kategori is not None:
+        query = query.where(models.Student.kategori == kategori)
+    if orang_tua_id is not None:
+        query = query.where(models.Student.orang_tua_id == orang_tua_id)
+    if cursor is not None:
+        query = query.where(models.Student.id > cursor)
+    query = query.order_by(models.Student.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    if selected is not None:
+        students = fast_json.rows_to_dicts(selected, result.all())
+        last_id = students[-1]["id"] if students else None
+    else:
+        students = result.scalars().all()
+        last_id = students[-1].id if students else None
+
+    if fast_json.FAST_JSON_RESPONSES:
+        # Schema sama dengan List[StudentListItem], di-encode langsung tanpa validasi per baris
+        response = Response(content=fast_json.dumps(students), media_type="application/json")
+    if limit is not None and len(students) == limit:
+        response.headers["X-Next-Cursor"] = str(last_id)
+    return response if fast_json.FAST_JSON_RESPONSES else students
 
 # Fungsi untuk menghitung jumlah siswa (HARUS SEBELUM /students/{id})
 @app.get("/students/count")
-def get_students_count(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def get_students_count(db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa melihat jumlah siswa")
     
-    total_students = db.query(models.Student).count()
+    total_students = await db.scalar(select(func.count()).select_from(models.Student))
     return {"total_students": total_students}
 
 # Fungsi untuk mengambil data siswa berdasarkan ID
 @app.get("/students/{id}", response_model=StudentResponse)
-def get_student_by_id(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    student = db.query(models.Student).filter(models.Student.id == id).first()
+async def get_student_by_id(id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    student = await db.get(models.Student, id)
     if not student:
         raise HTTPException(status_code=404, detail="Siswa tidak ditemukan")
     
@@ -285,11 +541,11 @@ def get_student_by_id(id: int, db: Session = Depends(get_db), current_user: mode
 
 # Fungsi untuk mengupdate data siswa
 @app.put("/students/{id}", response_model=StudentResponse)
-def update_student(id: int, updated: StudentBase, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def update_student(id: int, updated: StudentBase, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa edit data siswa")
 
-    student = db.query(models.Student).filter(models.Student.id == id).first()
+    student = await db.get(models.Student, id)
     if not student:
         raise HTTPException(status_code=404, detail="Siswa tidak ditemukan")
 
@@ -304,91 +560,131 @@ def update_student(id: int, updated: StudentBase, db: Session = Depends(get_db),
     student.rata_rata = rata_rata
     student.kategori = kategori
 
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
     return student
 
 # Fungsi untuk menghapus data siswa
 @app.delete("/students/{id}")
-def delete_student(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def delete_student(id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa menghapus data siswa")
 
-    student = db.query(models.Student).filter(models.Student.id == id).first()
+    student = await db.get(models.Student, id)
     if not student:
         raise HTTPException(status_code=404, detail="Siswa tidak ditemukan")
 
-    db.delete(student)
-    db.commit()
+    await db.delete(student)
+    await db.commit()
     return {"message": "Data siswa berhasil dihapus"}
 
 
 # Fungsi untuk membuat kegiatan
 @app.post("/kegiatan", response_model=KegiatanResponse)
-def create_kegiatan(kegiatan: KegiatanCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def create_kegiatan(kegiatan: KegiatanCreate, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa menambah kegiatan")
     
     new_kegiatan = models.Kegiatan(**kegiatan.dict(), admin_id=current_user.id)
     db.add(new_kegiatan)
-    db.commit()
-    db.refresh(new_kegiatan)
+    await db.commit()
+    kegiatan_cache.invalidate()
+    await db.refresh(new_kegiatan)
     return new_kegiatan
 
-# Fungsi untuk mengambil semua kegiatan
+async def listing_response(request, cache, kelas, load):
+    """
+    Respons list dari cache beserta ETag. Jika If-None-Match cocok dijawab 304
+    tanpa query DB dan tanpa serialisasi. load() mengembalikan body JSON (bytes).
+    """
+    listing = cache.get(kelas)
+    if listing is None:
+        generation = cache.generation
+        listing = cache.put(kelas, generation, await load())
+    headers = {"ETag": listing.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), listing.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=listing.body, media_type="application/json", headers=headers)
+
+async def load_listing(db, model, key, item_fields, response_model, kelas):
+    """
+    Body JSON list kegiatan/pengumuman. Jalur cepat memilih kolom sesuai schema
+    item sebagai tuple dan meng-encode-nya langsung, jalur lama lewat Pydantic.
+    """
+    if fast_json.FAST_JSON_RESPONSES:
+        query = select(*[getattr(model, field) for field in item_fields])
+    else:
+        query = select(model)
+    if kelas is not None:
+        query = query.where(model.kelas == kelas)
+    result = await db.execute(query)
+    if fast_json.FAST_JSON_RESPONSES:
+        return fast_json.dumps({key: fast_json.rows_to_dicts(item_fields, result.all())})
+    listing = response_model.model_validate({key: result.scalars().all()}, from_attributes=True)
+    return listing.model_dump_json().encode()
+
+# Fungsi untuk mengambil semua kegiatan (opsional difilter per kelas)
 @app.get("/kegiatan", response_model=KegiatanListResponse)
-def get_kegiatan(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    kegiatan_list = db.query(models.Kegiatan).all()
-    return {"kegiatan": kegiatan_list}
+async def get_kegiatan(
+    request: Request,
+    kelas: Optional[str] = Query(None, description="Hanya kegiatan untuk kelas ini"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    async def load():
+        return await load_listing(db, models.Kegiatan, "kegiatan", KEGIATAN_FIELDS, KegiatanListResponse, kelas)
+
+    return await listing_response(request, kegiatan_cache, kelas, load)
 
 
 # Fungsi untuk mengambil kegiatan berdasarkan ID
 @app.get("/kegiatan/{id}", response_model=KegiatanResponse)
-def get_kegiatan_by_id(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    kegiatan = db.query(models.Kegiatan).filter(models.Kegiatan.id == id).first()
+async def get_kegiatan_by_id(id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    kegiatan = await db.get(models.Kegiatan, id)
     if not kegiatan:
         raise HTTPException(status_code=404, detail="Kegiatan tidak ditemukan")
     return kegiatan
 
 # Fungsi untuk mengupdate kegiatan
 @app.put("/kegiatan/{id}", response_model=KegiatanResponse)
-def update_kegiatan(id: int, updated: KegiatanBase, db: Session = Depends
-(get_db), current_user: models.User = Depends(get_current_user)):
+async def update_kegiatan(id: int, updated: KegiatanBase, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa mengedit kegiatan")
 
-    kegiatan = db.query(models.Kegiatan).filter(models.Kegiatan.id == id).first()
+    kegiatan = await db.get(models.Kegiatan, id)
     if not kegiatan:
         raise HTTPException(status_code=404, detail="Kegiatan tidak ditemukan")
 
     for key, value in updated.dict().items():
         setattr(kegiatan, key, value)
 
-    db.commit()
-    db.refresh(kegiatan)
+    await db.commit()
+    kegiatan_cache.invalidate()
+    await db.refresh(kegiatan)
     return kegiatan
 
 # Fungsi untuk menghapus kegiatan
 @app.delete("/kegiatan/{id}")
-def delete_kegiatan(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def delete_kegiatan(id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Hanya admin yang bisa menghapus kegiatan")
 
-    kegiatan = db.query(models.Kegiatan).filter(models.Kegiatan.id == id).first()
+    kegiatan = await db.get(models.Kegiatan, id)
     if not kegiatan:
         raise HTTPException(status_code=404, detail="Kegiatan tidak ditemukan")
 
-    db.delete(kegiatan)
-    db.commit()
+    await db.delete(kegiatan)
+    await db.commit()
+    kegiatan_cache.invalidate()
     return {"message": "Kegiatan berhasil dihapus"}
 
 # Pengumuman CRUD
 # Fungsi untuk membuat Pengumuman
 @app.post("/pengumuman", response_model=PengumumanResponse)
-def create_pengumuman(
+async def create_pengumuman(
     pengumuman: PengumumanCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(
@@ -397,28 +693,34 @@ def create_pengumuman(
 
     new_pengumuman = models.Pengumuman(**pengumuman.dict(), admin_id=current_user.id)
     db.add(new_pengumuman)
-    db.commit()
-    db.refresh(new_pengumuman)
+    await db.commit()
+    pengumuman_cache.invalidate()
+    await db.refresh(new_pengumuman)
     return new_pengumuman
 
 
-# Fungsi untuk mengambil semua Pengumuman
+# Fungsi untuk mengambil semua Pengumuman (opsional difilter per kelas)
 @app.get("/pengumuman", response_model=PengumumanListResponse)
-def get_pengumuman(
-    db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)
+async def get_pengumuman(
+    request: Request,
+    kelas: Optional[str] = Query(None, description="Hanya pengumuman untuk kelas ini"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    pengumuman_list = db.query(models.Pengumuman).all()
-    return {"pengumuman": pengumuman_list}
+    async def load():
+        return await load_listing(db, models.Pengumuman, "pengumuman", PENGUMUMAN_FIELDS, PengumumanListResponse, kelas)
+
+    return await listing_response(request, pengumuman_cache, kelas, load)
 
 
 # Fungsi untuk mengambil Pengumuman berdasarkan ID
 @app.get("/pengumuman/{id}", response_model=PengumumanResponse)
-def get_pengumuman_by_id(
+async def get_pengumuman_by_id(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    pengumuman = db.query(models.Pengumuman).filter(models.Pengumuman.id == id).first()
+    pengumuman = await db.get(models.Pengumuman, id)
     if not pengumuman:
         raise HTTPException(status_code=404, detail="pengumuman tidak ditemukan")
     return pengumuman
@@ -426,65 +728,266 @@ def get_pengumuman_by_id(
 
 # Fungsi untuk mengupdate Pengumuman
 @app.put("/pengumuman/{id}", response_model=PengumumanResponse)
-def update_pengumuman(
+async def update_pengumuman(
     id: int,
     updated: PengumumanBase,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=403, detail="Hanya admin yang bisa mengedit pengumuman"
         )
 
-    pengumuman = db.query(models.Pengumuman).filter(models.Pengumuman.id == id).first()
+    pengumuman = await db.get(models.Pengumuman, id)
     if not pengumuman:
         raise HTTPException(status_code=404, detail="pengumuman tidak ditemukan")
 
     for key, value in updated.dict().items():
         setattr(pengumuman, key, value)
 
-    db.commit()
-    db.refresh(pengumuman)
+    await db.commit()
+    pengumuman_cache.invalidate()
+    await db.refresh(pengumuman)
     return pengumuman
 
 
 # Fungsi untuk menghapus Pengumuman
 @app.delete("/pengumuman/{id}")
-def delete_pengumuman(
+async def delete_pengumuman(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=403, detail="Hanya admin yang bisa menghapus pengumuman"
         )
 
-    pengumuman = db.query(models.Pengumuman).filter(models.Pengumuman.id == id).first()
+    pengumuman = await db.get(models.Pengumuman, id)
     if not pengumuman:
         raise HTTPException(status_code=404, detail="pengumuman tidak ditemukan")
 
-    db.delete(pengumuman)
-    db.commit()
+    await db.delete(pengumuman)
+    await db.commit()
+    pengumuman_cache.invalidate()
     return {"message": "pengumuman berhasil dihapus"}
 
 
+# Export data untuk laporan admin, di-stream per batch sehingga memori tetap datar
+# berapa pun jumlah barisnya. format=ndjson (default) atau csv
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+
+def export_response(export_format, name, columns, query):
+    return StreamingResponse(
+        export_chunks(export_format, columns, query),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'},
+    )
+
+@app.get("/export/students")
+async def export_students(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    kelas: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa export data siswa")
+
+    query = select(*[getattr(models.Student, field) for field in STUDENT_FIELDS]).order_by(models.Student.id)
+    if kelas is not None:
+        query = query.where(models.Student.kelas == kelas)
+    return export_response(format, "students", STUDENT_FIELDS, query)
+
+@app.get("/export/kegiatan")
+async def export_kegiatan(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa export kegiatan")
+
+    columns = ["id"] + list(KegiatanBase.__fields__)
+    query = select(*[getattr(models.Kegiatan, column) for column in columns]).order_by(models.Kegiatan.id)
+    return export_response(format, "kegiatan", columns, query)
+
+@app.get("/export/pengumuman")
+async def export_pengumuman(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa export pengumuman")
+
+    columns = ["id"] + list(PengumumanBase.__fields__)
+    query = select(*[getattr(models.Pengumuman, column) for column in columns]).order_by(models.Pengumuman.id)
+    return export_response(format, "pengumuman", columns, query)
+
+
+# Statistik per kelas dari tabel agregat kelas_stats (satu baris, tanpa scan students)
+@app.get("/stats/kelas/{kelas}", response_model=KelasStatsResponse)
+async def get_kelas_stats(kelas: str, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    stats = await db.get(models.KelasStats, kelas)
+    if not stats or stats.jumlah_siswa == 0:
+        raise HTTPException(status_code=404, detail="Kelas tidak ditemukan")
+    return kelas_stats.summary(stats)
+
+async def run_inference(job):
+    """
+    Tunggu prediksi dari inference pool (atau threadpool jika INFERENCE_WORKERS=0).
+    Input tidak valid = 400, antrian penuh = 429, terlalu lama = 503.
+    """
+    try:
+        return await job
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Terlalu banyak permintaan prediksi, coba lagi sebentar",
+            headers={"Retry-After": "1"},
+        )
+    except InferenceTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server sedang sibuk, coba lagi sebentar",
+            headers={"Retry-After": "5"},
+        )
+
 # Fungsi untuk melakukan prediksi
-@app.post("/predict", response_model=PredictResponse)
-def predict(data: PredictRequest, current_user: models.User = Depends(get_current_user)):
-    result = predict_performance(
-        data.al_quran_iqro,
-        data.hafalan_surat_pendek,
-        data.hafalan_doa,
-        data.hafalan_ayat_pilihan,
-        data.bahasa_arab,
-        data.bahasa_inggris,
-        data.khat_menulis,
-        data.menggambar_mewarnai,
-        data.jasmani_kesehatan,
-        data.kreativitas_keaktifan,
-        data.ulumul_quran,
-        data.kemampuan_berbahasa
+@app.post("/predict", response_model=PredictResponse, response_model_exclude_unset=True)
+async def predict(
+    data: PredictRequest,
+    explain: bool = Query(False, description="Sertakan kontribusi fitur terhadap kategori hasil prediksi"),
+    top_k: int = Query(3, ge=1, le=len(SUBJECT_FIELDS), description="Jumlah fitur yang dijelaskan"),
+    current_user: Principal = Depends(get_token_principal),
+):
+    started = time.perf_counter()
+    scores = [getattr(data, field) for field in SUBJECT_FIELDS]
+    detail, model_version = await run_inference(pooled.predict_performance_details(scores, top_k if explain else 0))
+    prediction_log.log_predictions(
+        current_user, "/predict", [scores], [detail], model_version, (time.perf_counter() - started) * 1000
+    )
+    return {**detail, "model_version": model_version}
+
+# Fungsi untuk melakukan prediksi banyak siswa sekaligus
+# Urutan hasil: semua items lalu semua student_ids, sesuai urutan input
+@app.post("/predict/batch", response_model=PredictBatchResponse, response_model_exclude_unset=True)
+async def predict_batch(
+    data: PredictBatchRequest,
+    explain: bool = Query(False, description="Sertakan kontribusi fitur untuk setiap siswa"),
+    top_k: int = Query(3, ge=1, le=len(SUBJECT_FIELDS), description="Jumlah fitur yang dijelaskan"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    started = time.perf_counter()
+    total = len(data.items) + len(data.student_ids)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Data prediksi kosong")
+    if total > PREDICT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maksimal {PREDICT_BATCH_MAX_SIZE} siswa per request",
+        )
+
+    score_rows = [[getattr(item, field) for field in SUBJECT_FIELDS] for item in data.items]
+    student_ids = [None] * len(data.items)
+
+    if data.student_ids:
+        columns = [getattr(models.Student, field) for field in SUBJECT_FIELDS]
+        result = await db.execute(
+            select(models.Student.id, models.Student.orang_tua_id, *columns)
+            .where(models.Student.id.in_(set(data.student_ids)))
+        )
+        rows = result.all()
+        rows_by_id = {row[0]: row for row in rows}
+
+        for student_id in data.student_ids:
+            row = rows_by_id.get(student_id)
+            if row is None:
+                raise HTTPException(status_code=404, detail=f"Siswa dengan ID {student_id} tidak ditemukan")
+            # Jika role orang_tua, hanya boleh memprediksi anaknya sendiri
+            if current_user.role == "orang_tua" and row[1] != current_user.id:
+                raise HTTPException(status_code=403, detail="Akses ditolak")
+            score_rows.append(row[2:])
+            student_ids.append(student_id)
+
+    details, model_version = await run_inference(
+        pooled.predict_performance_batch_details(score_rows, top_k if explain else 0)
     )
-    return {"kategori": result}
\ No newline at end of file
+    prediction_log.log_predictions(
+        current_user, "/predict/batch", score_rows, details, model_version,
+        (time.perf_counter() - started) * 1000, student_ids,
+    )
+    return {
+        "results": [
+            {"student_id": student_id, **detail}
+            for student_id, detail in zip(student_ids, details)
+        ],
+        "model_version": model_version,
+    }
+
+# Statistik cache prediksi (hit/miss/eviction) untuk menentukan ukuran cache
+@app.get("/predict/cache")
+def get_prediction_cache_stats(current_user: Principal = Depends(get_token_principal)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa melihat statistik cache")
+    return prediction_cache.stats()
+
+# Metrics format Prometheus untuk scraper (tanpa token, batasi aksesnya di reverse proxy)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    caches = {"prediction": prediction_cache.stats(), "user": user_cache.stats(),
+              "kegiatan": kegiatan_cache.stats(), "pengumuman": pengumuman_cache.stats()}
+    return PlainTextResponse(metrics.render(caches), media_type="text/plain; version=0.0.4")
+
+# Readiness probe (tanpa token): 503 sampai database siap dan warm-up model selesai
+@app.get("/ready", include_in_schema=False)
+def get_readiness():
+    status = readiness.status()
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+# Status background writer log prediksi (record di queue, ditulis, dibuang)
+@app.get("/predict/log")
+def get_prediction_log_stats(current_user: Principal = Depends(get_token_principal)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa melihat status log prediksi")
+    return prediction_log.writer.stats()
+
+# Status inference pool (antrian, jumlah batch, rata-rata baris per batch, ditolak, timeout)
+@app.get("/predict/pool")
+def get_inference_pool_stats(current_user: Principal = Depends(get_token_principal)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa melihat status inference pool")
+    return inference_pool.stats()
+
+# Informasi model yang sedang aktif
+@app.get("/model", response_model=ModelInfoResponse)
+def get_model_info(current_user: Principal = Depends(get_token_principal)):
+    if registry.current is None:
+        raise HTTPException(status_code=503, detail="Model tidak tersedia")
+    return registry.current.info()
+
+# Reload model tanpa restart worker. Model baru di-load dan divalidasi dulu,
+# request /predict yang sedang berjalan tetap memakai model lama sampai selesai.
+@app.post("/model/reload", response_model=ModelReloadResponse)
+def reload_model(data: ModelReloadRequest = ModelReloadRequest(), current_user: Principal = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Hanya admin yang bisa reload model")
+
+    if data.path:
+        try:
+            path = resolve_model_path(data.path)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        path = registry.current.path if registry.current else None
+    try:
+        loaded, reloaded = registry.load(path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Gagal memuat model: {e}")
+    # Worker lain mengikuti lewat model watcher (MODEL_WATCH_INTERVAL_SECONDS)
+    registry.publish()
+    return {**loaded.info(), "reloaded": reloaded}
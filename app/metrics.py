@@ -0,0 +1,184 @@
+# file: app/metrics.py
+# Metrics format teks Prometheus tanpa dependency tambahan, dibaca lewat GET /metrics.
+#
+# - MetricsMiddleware (ASGI murni): jumlah request, histogram latency per route
+#   template (/students/{student_id}, bukan URL asli), request yang sedang berjalan,
+#   jumlah query dan waktu DB per request.
+# - Hook SQLAlchemy before/after_cursor_execute menghitung query ke akumulator
+#   request yang aktif (contextvar, ikut terbawa ke threadpool).
+# - ml_model mencatat waktu inferensi; statistik cache dibaca saat scrape.
+import bisect
+import contextvars
+import os
+import threading
+import time
+from sqlalchemy import event
+
+# 0 = middleware dan hook tidak dipasang, /metrics tetap ada tetapi kosong
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [jumlah per bucket (+Inf terakhir), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+http_requests_total = Counter(
+    "http_requests_total", "Jumlah request HTTP", ("method", "route", "status"))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Latency request HTTP per route template", ("method", "route"))
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Jumlah query DB per request", ("method", "route"), QUERY_COUNT_BUCKETS)
+http_request_db_duration = Histogram(
+    "http_request_db_seconds", "Total waktu query DB per request", ("method", "route"))
+db_queries_total = Counter("db_queries_total", "Jumlah query DB (termasuk di luar request)")
+model_inference_duration = Histogram(
+    "model_inference_seconds", "Waktu inferensi model per pemanggilan", ("kind",))
+
+# Request yang sedang diproses; hanya diubah dari event loop
+_in_flight = 0
+
+# Akumulator query DB milik request yang sedang berjalan: [jumlah, detik]
+_request_db = contextvars.ContextVar("request_db", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_start"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_query_start", None)
+    db_queries_total.inc()
+    usage = _request_db.get()
+    if usage is not None and started is not None:
+        usage[0] += 1
+        usage[1] += time.perf_counter() - started
+
+def instrument_engine(engine):
+    """Pasang hook penghitung query pada engine sync (untuk AsyncEngine: .sync_engine)"""
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def observe_inference(kind, seconds):
+    if METRICS_ENABLED:
+        model_inference_duration.observe(seconds, (kind,))
+
+class MetricsMiddleware:
+    """Middleware ASGI murni (tanpa BaseHTTPMiddleware) agar overhead per request minimal"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        usage = [0, 0.0]
+        token = _request_db.set(usage)
+        _in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            _in_flight -= 1
+            _request_db.reset(token)
+            # FastAPI menaruh route yang cocok di scope; URL yang tidak cocok digabung
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            http_requests_total.inc(labels + (str(status_code),))
+            http_request_duration.observe(duration, labels)
+            http_request_db_queries.observe(usage[0], labels)
+            http_request_db_duration.observe(usage[1], labels)
+
+def _cache_lines(caches):
+    lines = []
+    for name, help_text, key in [
+        ("cache_hits_total", "Jumlah cache hit", "hits"),
+        ("cache_misses_total", "Jumlah cache miss", "misses"),
+        ("cache_hit_ratio", "Rasio hit cache sejak start", "hit_rate"),
+        ("cache_entries", "Jumlah entry di cache", "size"),
+    ]:
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for cache_name, stats in caches.items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {stats[key]}')
+    return lines
+
+def render(caches=None):
+    """Seluruh metrics dalam format teks Prometheus; caches = {nama: LRUCache.stats()}"""
+    lines = []
+    for metric in (http_requests_total, http_request_duration, http_request_db_queries,
+                   http_request_db_duration, db_queries_total, model_inference_duration):
+        lines += metric.render()
+    lines += ["# HELP http_requests_in_flight Request yang sedang diproses",
+              "# TYPE http_requests_in_flight gauge",
+              f"http_requests_in_flight {_in_flight}"]
+    lines += _cache_lines(caches or {})
+    return "\n".join(lines) + "\n"
@@ -1,74 +1,301 @@
 # file: app/ml_model.py
+import hashlib
 import pickle
 import numpy as np
-import pandas as pd
 import os
+import threading
+import time
+from .compiled_forest import CompiledForest, compile_forest
+from .model_registry import LoadedModel, ModelRegistry
+from .lru_cache import LRUCache
+from .metrics import observe_inference
 
-def load_model():
-    """Load model dari berbagai kemungkinan lokasi"""
-    model_paths = [
-        "student_model.pkl",  # Root directory
-        "app/student_model.pkl",  # App directory  
-        os.path.join(os.path.dirname(__file__), "student_model.pkl"),  # Same directory as this file
-        os.path.join(os.path.dirname(__file__), "..", "student_model.pkl"),  # Parent directory
+# Batas maksimum jumlah siswa dalam satu request prediksi batch
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "1000"))
+
+# Di atas jumlah baris ini traversal C milik sklearn lebih cepat dari forest terkompilasi
+# (lihat benchmarks/bench_compiled_forest.py)
+COMPILED_FOREST_MAX_ROWS = 500
+
+# Format model yang di-load: "pickle" (student_model.pkl) atau "mmap"
+# (array .npy + manifest hasil train_model.py, dibagi antar worker lewat page cache)
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "pickle")
+MMAP_MANIFEST_FILE = os.path.join("student_model_arrays", "manifest.json")
+
+# Direktori artefak model; POST /model/reload hanya menerima path di dalamnya
+MODEL_DIR = os.path.realpath(os.getenv("MODEL_DIR", os.path.dirname(__file__)))
+
+# Interval cek perubahan file model untuk hot-reload (0 = nonaktif). Juga interval
+# worker lain mengikuti POST /model/reload lewat MODEL_ACTIVE_FILE (gunicorn.conf.py: 5 detik)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "0"))
+MODEL_ACTIVE_FILE = os.getenv("MODEL_ACTIVE_FILE", os.path.join(MODEL_DIR, ".active_model.json"))
+
+# Cache hasil prediksi per vektor nilai (0 = nonaktif)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "4096"))
+PREDICT_CACHE_TTL_SECONDS = float(os.getenv("PREDICT_CACHE_TTL_SECONDS", "600"))
+
+# Feature names yang sama dengan yang digunakan saat training
+FEATURE_NAMES = [
+    'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
+    'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
+    'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa'
+]
+
+# Nama field nilai di schema/ORM, urutannya sama dengan FEATURE_NAMES
+SUBJECT_FIELDS = [name.lower() for name in FEATURE_NAMES]
+
+def validate_feature_names(model):
+    """
+    Cek sekali saat load bahwa fitur model sama dengan FEATURE_NAMES.
+    Setelah valid, feature_names_in_ dihapus supaya input NumPy tidak
+    memicu warning nama fitur dari sklearn di setiap prediksi.
+    """
+    fitted_names = getattr(model, "feature_names_in_", None)
+    if fitted_names is not None:
+        if list(fitted_names) != FEATURE_NAMES:
+            raise ValueError(f"Fitur model tidak sesuai: {list(fitted_names)}")
+        del model.feature_names_in_
+    elif model.n_features_in_ != len(FEATURE_NAMES):
+        raise ValueError(f"Model membutuhkan {model.n_features_in_} fitur, bukan {len(FEATURE_NAMES)}")
+    return model
+
+def _predictor(loaded, n_rows=1):
+    """Evaluator yang dipakai untuk prediksi: forest terkompilasi jika ada"""
+    if loaded.model is None:
+        # Artefak mmap hanya berisi forest terkompilasi
+        return loaded.compiled
+    if loaded.compiled is None or n_rows > COMPILED_FOREST_MAX_ROWS:
+        return loaded.model
+    return loaded.compiled
+
+def _model_paths(file_name):
+    """Kemungkinan lokasi file model"""
+    return [
+        file_name,  # Root directory
+        os.path.join("app", file_name),  # App directory
+        os.path.join(os.path.dirname(__file__), file_name),  # Same directory as this file
+        os.path.join(os.path.dirname(__file__), "..", file_name),  # Parent directory
     ]
-    
-    for path in model_paths:
+
+def _load_pickle(model_path):
+    mtime = os.path.getmtime(model_path)
+    with open(model_path, "rb") as f:
+        data = f.read()
+    model = validate_feature_names(pickle.loads(data))
+    version = hashlib.sha256(data).hexdigest()[:12]
+    return LoadedModel(model, compile_forest(model), version, os.path.abspath(model_path), mtime)
+
+def _load_mmap(manifest_path):
+    mtime = os.path.getmtime(manifest_path)
+    compiled, manifest = CompiledForest.load(manifest_path, mmap_mode="r")
+    if manifest["feature_names"] != FEATURE_NAMES:
+        raise ValueError(f"Fitur model tidak sesuai: {manifest['feature_names']}")
+    return LoadedModel(None, compiled, manifest["version"], os.path.abspath(manifest_path), mtime)
+
+def resolve_model_path(path):
+    """
+    Path model dari request (relatif terhadap MODEL_DIR atau absolut). Unpickle
+    bisa menjalankan kode, jadi path di luar MODEL_DIR ditolak dengan ValueError.
+    """
+    resolved = os.path.realpath(os.path.join(MODEL_DIR, path))
+    if os.path.commonpath([resolved, MODEL_DIR]) != MODEL_DIR:
+        raise ValueError(f"Path model harus berada di dalam {MODEL_DIR}")
+    return resolved
+
+def load_model(path=None):
+    """
+    Load dan validasi model dari path, atau dari berbagai kemungkinan lokasi
+    jika path tidak diberikan. Path .json dianggap manifest artefak mmap.
+    Versi model = hash SHA-256 file pickle asal.
+    """
+    default_file = MMAP_MANIFEST_FILE if MODEL_FORMAT == "mmap" else "student_model.pkl"
+    model_paths = [path] if path else _model_paths(default_file)
+
+    for model_path in model_paths:
         try:
-            if os.path.exists(path):
-                with open(path, "rb") as f:
-                    model = pickle.load(f)
-                print(f"Model loaded from: {path}")
-                return model
+            if os.path.exists(model_path):
+                if model_path.endswith(".json"):
+                    loaded = _load_mmap(model_path)
+                else:
+                    loaded = _load_pickle(model_path)
+
+                # Pastikan artefak benar-benar bisa dipakai sebelum dipasang
+                _predictor(loaded).predict(np.zeros((1, len(FEATURE_NAMES)), dtype=np.float32))
+                print(f"Model loaded from: {model_path} (versi {loaded.version})")
+                return loaded
         except Exception as e:
-            print(f"Failed to load model from {path}: {e}")
+            print(f"Failed to load model from {model_path}: {e}")
+            if path:
+                raise
             continue
-    
+
     raise FileNotFoundError(
         "Model file tidak ditemukan! Pastikan sudah menjalankan train_model.py terlebih dahulu."
     )
 
-# Load model sekali saja saat app berjalan
-try:
-    model = load_model()
-except FileNotFoundError as e:
-    print(f"WARNING: {e}")
-    model = None
+# Key = (versi model, tuple 12 nilai), sehingga model baru tidak memakai hasil lama.
+# Value = dict detail tanpa kontribusi fitur (lihat predict_details), jangan diubah pemanggil.
+prediction_cache = LRUCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_SECONDS)
 
-# Feature names yang sama dengan yang digunakan saat training
-FEATURE_NAMES = [
-    'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
-    'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
-    'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa'
-]
+# Cache dikosongkan setiap kali model baru dipasang
+registry = ModelRegistry(load_model, on_swap=lambda loaded: prediction_cache.clear(), shared_file=MODEL_ACTIVE_FILE)
 
-def predict_performance(al_quran_iqro, hafalan_surat_pendek, hafalan_doa, hafalan_ayat_pilihan, 
-                       bahasa_arab, bahasa_inggris, khat_menulis, menggambar_mewarnai, 
-                       jasmani_kesehatan, kreativitas_keaktifan, ulumul_quran, kemampuan_berbahasa):
+# Model tidak di-load saat import (unpickle menarik sklearn), lihat app/startup.py
+_initial_load_lock = threading.Lock()
+
+def ensure_model_loaded():
     """
-    Prediksi performa siswa berdasarkan 12 mata pelajaran
+    Load model pertama kali jika belum ada (warm-up startup atau request pertama).
+    Pemanggil bersamaan menunggu satu load yang sama. Mengembalikan model aktif atau None.
     """
-    if model is None:
+    if registry.current is None:
+        with _initial_load_lock:
+            if registry.current is None:
+                try:
+                    registry.load()
+                except FileNotFoundError as e:
+                    print(f"WARNING: {e}")
+    return registry.current
+
+def current_model():
+    """Snapshot model aktif; satu request harus memakai snapshot yang sama dari awal sampai akhir"""
+    loaded = registry.current or ensure_model_loaded()
+    if loaded is None:
         raise Exception("Model tidak tersedia. Jalankan train_model.py terlebih dahulu.")
-    
-    # Buat DataFrame dengan nama kolom yang sama seperti saat training
-    input_data = pd.DataFrame([{
-        'Al_Quran_Iqro': al_quran_iqro,
-        'Hafalan_Surat_Pendek': hafalan_surat_pendek,
-        'Hafalan_Doa': hafalan_doa,
-        'Hafalan_Ayat_Pilihan': hafalan_ayat_pilihan,
-        'Bahasa_Arab': bahasa_arab,
-        'Bahasa_Inggris': bahasa_inggris,
-        'Khat_Menulis': khat_menulis,
-        'Menggambar_Mewarnai': menggambar_mewarnai,
-        'Jasmani_Kesehatan': jasmani_kesehatan,
-        'Kreativitas_Keaktifan': kreativitas_keaktifan,
-        'Ulumul_Quran': ulumul_quran,
-        'Kemampuan_Berbahasa': kemampuan_berbahasa
-    }])
-    
-    # Pastikan urutan kolom sama dengan saat training
-    input_data = input_data[FEATURE_NAMES]
-    
-    prediction = model.predict(input_data)
-    return prediction[0]
\ No newline at end of file
+    return loaded
+
+def predict_row(row, loaded=None):
+    """
+    Jalur cepat tanpa pandas: row adalah array NumPy berisi 12 nilai
+    dengan urutan FEATURE_NAMES (sebaiknya float32)
+    """
+    loaded = loaded or current_model()
+    return _predictor(loaded).predict(row.reshape(1, -1))[0]
+
+def summarize_proba(classes, proba):
+    """Kategori, probabilitas per kelas dan selisih dua probabilitas teratas untuk satu baris"""
+    order = np.argsort(-proba, kind="stable")  # Seri dimenangkan kelas pertama, sama seperti predict
+    margin = proba[order[0]] - proba[order[1]] if len(order) > 1 else proba[order[0]]
+    return {
+        "kategori": str(classes[order[0]]),
+        "probabilities": {str(label): round(float(p), 4) for label, p in zip(classes, proba)},
+        "margin": round(float(margin), 4),
+    }
+
+def top_contributions(contributions, class_indices, top_k):
+    """
+    Untuk setiap baris: top_k fitur dengan kontribusi absolut terbesar ke
+    probabilitas kelas class_indices[baris]
+    """
+    values = contributions[np.arange(len(contributions)), :, class_indices]  # (n_rows, n_features)
+    order = np.argsort(-np.abs(values), axis=1, kind="stable")[:, :top_k]
+    return [
+        [{"fitur": SUBJECT_FIELDS[i], "kontribusi": round(float(row[i]), 4)} for i in row_order]
+        for row, row_order in zip(values, order)
+    ]
+
+def predict_details(X, loaded, top_k=0):
+    """
+    Detail prediksi per baris X: kategori, probabilities, margin, dan jika top_k > 0
+    juga baseline (probabilitas awal kategori tersebut) + top_k kontribusi fitur
+    yang dihitung dari jalur pohon di forest terkompilasi.
+    """
+    started = time.perf_counter()
+    contributions = None
+    if top_k:
+        if loaded.compiled is None:
+            raise ValueError("Model ini tidak mendukung penjelasan prediksi")
+        proba, bias, contributions = loaded.compiled.explain(X)
+        classes = loaded.compiled.classes_
+    else:
+        predictor = _predictor(loaded, len(X))
+        proba = predictor.predict_proba(X)
+        classes = predictor.classes_
+    observe_inference("explain" if top_k else ("single" if len(X) == 1 else "batch"), time.perf_counter() - started)
+
+    results = [summarize_proba(classes, row) for row in proba]
+    if contributions is not None:
+        class_indices = np.argmax(proba, axis=1)
+        for detail, class_index, top in zip(results, class_indices, top_contributions(contributions, class_indices, top_k)):
+            detail["baseline"] = round(float(bias[class_index]), 4)
+            detail["contributions"] = top
+    return results
+
+def predict_performance_details(scores, top_k=0):
+    """
+    Prediksi satu siswa dari 12 nilai (urutan FEATURE_NAMES) lengkap dengan
+    probabilitas dan margin; top_k > 0 menambahkan kontribusi fitur.
+    Mengembalikan (dict detail, versi model yang dipakai).
+    """
+    scores = tuple(scores)
+    loaded = current_model()
+    if top_k:
+        # Penjelasan tidak di-cache, explain sekaligus menghitung probabilitas
+        return predict_details(np.array([scores], dtype=np.float32), loaded, top_k)[0], loaded.version
+
+    cache_key = (loaded.version, scores)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached, loaded.version
+
+    detail = predict_details(np.array([scores], dtype=np.float32), loaded)[0]
+    prediction_cache.put(cache_key, detail)
+    return detail, loaded.version
+
+def predict_performance(al_quran_iqro, hafalan_surat_pendek, hafalan_doa, hafalan_ayat_pilihan,
+                       bahasa_arab, bahasa_inggris, khat_menulis, menggambar_mewarnai,
+                       jasmani_kesehatan, kreativitas_keaktifan, ulumul_quran, kemampuan_berbahasa):
+    """
+    Prediksi performa siswa berdasarkan 12 mata pelajaran.
+    Mengembalikan (kategori, versi model yang dipakai).
+    """
+    # Urutan harus sama dengan FEATURE_NAMES
+    scores = (
+        al_quran_iqro,
+        hafalan_surat_pendek,
+        hafalan_doa,
+        hafalan_ayat_pilihan,
+        bahasa_arab,
+        bahasa_inggris,
+        khat_menulis,
+        menggambar_mewarnai,
+        jasmani_kesehatan,
+        kreativitas_keaktifan,
+        ulumul_quran,
+        kemampuan_berbahasa
+    )
+    detail, version = predict_performance_details(scores)
+    return detail["kategori"], version
+
+def scores_to_matrix(score_rows):
+    """
+    Ubah list nilai 12 mata pelajaran (urutan FEATURE_NAMES) menjadi
+    matrix float32 yang contiguous, siap untuk model.predict
+    """
+    X = np.ascontiguousarray(score_rows, dtype=np.float32)
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(f"Setiap baris harus berisi {len(FEATURE_NAMES)} nilai")
+    return X
+
+def predict_performance_batch(score_rows):
+    """
+    Prediksi performa banyak siswa sekaligus dengan satu pemanggilan predict.
+    Mengembalikan (list kategori sesuai urutan input, versi model yang dipakai).
+    """
+    loaded = current_model()
+    X = scores_to_matrix(score_rows)
+    if len(X) == 0:
+        return [], loaded.version
+
+    return _predictor(loaded, len(X)).predict(X).tolist(), loaded.version
+
+def predict_performance_batch_details(score_rows, top_k=0):
+    """
+    Seperti predict_performance_batch tetapi setiap hasil berupa dict detail
+    (lihat predict_details). Mengembalikan (list detail, versi model yang dipakai).
+    """
+    loaded = current_model()
+    X = scores_to_matrix(score_rows)
+    if len(X) == 0:
+        return [], loaded.version
+    return predict_details(X, loaded, top_k), loaded.version
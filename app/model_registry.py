@@ -0,0 +1,126 @@
+# file: app/model_registry.py
+import json
+import os
+import threading
+import time
+
+class LoadedModel:
+    """
+    Satu artefak model yang sudah di-load dan divalidasi.
+    Tidak pernah diubah setelah dibuat, sehingga aman dibaca banyak thread.
+    """
+
+    def __init__(self, model, compiled, version, path, mtime):
+        self.model = model
+        self.compiled = compiled  # CompiledForest atau None
+        self.version = version
+        self.path = path
+        self.mtime = mtime
+
+    def info(self):
+        return {"version": self.version, "path": self.path, "mtime": self.mtime}
+
+class ModelRegistry:
+    """
+    Menyimpan model yang sedang aktif dan menggantinya tanpa restart worker.
+
+    Model baru di-load dan divalidasi lebih dulu di luar jalur request, lalu
+    dipasang dengan satu assignment referensi (atomik di Python). Request
+    yang sedang berjalan tetap memakai snapshot lama sampai selesai.
+    """
+
+    def __init__(self, loader, on_swap=None, shared_file=None):
+        self._loader = loader  # loader(path) -> LoadedModel, path None = cari otomatis
+        self._on_swap = on_swap
+        self._shared_file = shared_file  # Path model aktif yang dibagi semua worker, lihat publish()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self.current = None
+        self.last_error = None
+
+    def load(self, path=None):
+        """
+        Load model dari path lalu pasang jika versi atau path-nya berbeda.
+        Mengembalikan (LoadedModel aktif, True jika model diganti).
+        """
+        with self._reload_lock:
+            try:
+                loaded = self._loader(path)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            self.last_error = None
+
+            current = self.current
+            if current is not None and (loaded.version, loaded.path) == (current.version, current.path):
+                return current, False
+
+            self.current = loaded
+            if self._on_swap is not None:
+                self._on_swap(loaded)
+            print(f"Model aktif: versi {loaded.version} dari {loaded.path}")
+            return loaded, True
+
+    def publish(self):
+        """
+        Tulis path model aktif ke shared_file. Watcher di worker lain (proses
+        terpisah, misalnya gunicorn) memasang file yang sama pada cek berikutnya.
+        """
+        current = self.current
+        if self._shared_file is None or current is None:
+            return
+        temp_file = f"{self._shared_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "w") as f:
+                json.dump({"path": current.path, "version": current.version}, f)
+            os.replace(temp_file, self._shared_file)
+        except OSError as e:
+            print(f"Gagal menulis {self._shared_file}: {e}")
+
+    def _read_shared(self):
+        """(mtime, path) dari shared_file, None jika belum pernah ditulis"""
+        try:
+            mtime = os.stat(self._shared_file).st_mtime_ns
+            with open(self._shared_file) as f:
+                return mtime, json.load(f)["path"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def watch(self, interval_seconds):
+        """
+        Di thread background: pasang model yang di-publish worker lain, dan
+        reload jika mtime file model aktif berubah.
+        """
+        if self._watcher is not None or interval_seconds <= 0:
+            return
+
+        def run():
+            last_seen = self.current.mtime if self.current is not None else None
+            shared_seen = None
+            while True:
+                time.sleep(interval_seconds)
+                current = self.current
+                if current is None:
+                    continue
+                shared = self._read_shared() if self._shared_file is not None else None
+                if shared is not None and shared != shared_seen:
+                    # Juga saat worker baru start setelah reload ke file lain
+                    shared_seen = shared
+                    if shared[1] != current.path:
+                        try:
+                            current, _ = self.load(shared[1])
+                            last_seen = current.mtime
+                        except Exception as e:
+                            print(f"Gagal memasang model dari {shared[1]}: {e}")
+                try:
+                    mtime = os.path.getmtime(current.path)
+                    if mtime == last_seen:
+                        continue
+                    self.load(current.path)
+                    # Hanya dicatat jika berhasil, file yang masih ditulis akan dicoba lagi
+                    last_seen = mtime
+                except Exception as e:
+                    print(f"Gagal reload model dari {current.path}: {e}")
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
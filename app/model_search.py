@@ -0,0 +1,195 @@
+# file: app/model_search.py
+# Hyperparameter search RandomForest dengan stratified k-fold CV.
+#
+# Setiap pasangan (kandidat parameter, fold) dijalankan paralel di process pool
+# dan hasilnya langsung disimpan ke disk, sehingga search yang terhenti bisa
+# dilanjutkan tanpa mengulang fold yang sudah selesai. Model terbaik di-fit
+# ulang pada seluruh data lalu disimpan bersama file metrics JSON.
+#
+# Jalankan dari root project:
+#   python app/train_model.py --search [--grid grid.json] [--n-iter 20] [--folds 5] [--jobs 4]
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+try:
+    from .dataset_cache import file_hash, load_dataset
+    from .train_model import FEATURE_COLUMNS, MODEL_PATH, TARGET_COLUMN, export_model_arrays, save_model
+except ImportError:  # Dijalankan langsung: python app/train_model.py --search
+    from dataset_cache import file_hash, load_dataset
+    from train_model import FEATURE_COLUMNS, MODEL_PATH, TARGET_COLUMN, export_model_arrays, save_model
+
+SEARCH_CACHE_DIR = "app/model_search_cache"
+METRICS_PATH = "app/student_model_metrics.json"
+SCORING = ["accuracy", "f1_macro"]
+
+# Ruang parameter default; bisa diganti dengan file JSON lewat --grid
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 10, 20],
+    "min_samples_split": [2, 5],
+    "min_samples_leaf": [1, 2],
+    "max_features": ["sqrt", 0.5],
+}
+
+def load_param_grid(path=None):
+    if path is None:
+        return DEFAULT_PARAM_GRID
+    with open(path) as f:
+        return json.load(f)
+
+def candidates(param_grid, n_iter=None, random_state=42):
+    """Semua kombinasi grid, atau n_iter kombinasi acak (random search)"""
+    if n_iter:
+        return list(ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state))
+    return list(ParameterGrid(param_grid))
+
+def task_key(dataset_hash, params, fold, n_splits, random_state):
+    """Key cache satu fold: berubah jika dataset, parameter atau pembagian fold berubah"""
+    payload = json.dumps(
+        {"dataset": dataset_hash, "params": params, "fold": fold, "n_splits": n_splits, "seed": random_state},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+# Data training untuk worker, di-set sekali per proses lewat initializer
+_worker_data = {}
+
+def _init_worker(X, y, folds):
+    _worker_data.update(X=X, y=y, folds=folds)
+
+def _run_fold(params, fold, random_state):
+    X, y = _worker_data["X"], _worker_data["y"]
+    train_index, test_index = _worker_data["folds"][fold]
+    started = time.perf_counter()
+    model = RandomForestClassifier(**params, random_state=random_state, n_jobs=1)
+    model.fit(X[train_index], y[train_index])
+    y_pred = model.predict(X[test_index])
+    return {
+        "params": params,
+        "fold": fold,
+        "accuracy": float(accuracy_score(y[test_index], y_pred)),
+        "f1_macro": float(f1_score(y[test_index], y_pred, average="macro")),
+        "fit_seconds": round(time.perf_counter() - started, 3),
+    }
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def summarize(param_list, fold_results, scoring):
+    """Rata-rata dan standar deviasi skor per kandidat, diurutkan dari yang terbaik"""
+    summary = []
+    for params in param_list:
+        folds = [r for r in fold_results if r["params"] == params]
+        entry = {"params": params, "folds": len(folds)}
+        for metric in SCORING:
+            scores = np.array([r[metric] for r in folds])
+            entry[f"mean_{metric}"] = round(float(scores.mean()), 6)
+            entry[f"std_{metric}"] = round(float(scores.std()), 6)
+        entry["mean_fit_seconds"] = round(float(np.mean([r["fit_seconds"] for r in folds])), 3)
+        summary.append(entry)
+    summary.sort(key=lambda entry: entry[f"mean_{scoring}"], reverse=True)
+    return summary
+
+def run_search(csv_path, param_grid=None, n_iter=None, n_splits=5, jobs=None, scoring="accuracy",
+               random_state=42, cache_dir=SEARCH_CACHE_DIR, model_path=MODEL_PATH, metrics_path=METRICS_PATH):
+    if scoring not in SCORING:
+        raise ValueError(f"scoring harus salah satu dari {SCORING}")
+    jobs = jobs or os.cpu_count() or 1
+
+    df = load_dataset(csv_path, FEATURE_COLUMNS + [TARGET_COLUMN])
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    y = df[TARGET_COLUMN].to_numpy()
+    dataset_hash = file_hash(csv_path)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X, y))
+
+    param_list = candidates(param_grid or DEFAULT_PARAM_GRID, n_iter, random_state)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Fold yang sudah ada di cache tidak dijalankan ulang
+    fold_results, pending = [], []
+    for params in param_list:
+        for fold in range(n_splits):
+            path = os.path.join(cache_dir, task_key(dataset_hash, params, fold, n_splits, random_state) + ".json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    fold_results.append(json.load(f))
+            else:
+                pending.append((params, fold, path))
+
+    print(f"{len(param_list)} kandidat x {n_splits} fold: {len(fold_results)} dari cache, "
+          f"{len(pending)} dijalankan dengan {jobs} proses")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(X, y, folds)) as executor:
+        futures = {executor.submit(_run_fold, params, fold, random_state): path for params, fold, path in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            _write_json(futures[future], result)
+            fold_results.append(result)
+            print(f"[{done}/{len(pending)}] {result['params']} fold {result['fold']}: "
+                  f"accuracy {result['accuracy']:.4f}, f1_macro {result['f1_macro']:.4f}")
+    search_seconds = time.perf_counter() - started
+
+    summary = summarize(param_list, fold_results, scoring)
+    best = summary[0]
+    print(f"Parameter terbaik ({scoring} {best[f'mean_{scoring}']:.4f}): {best['params']}")
+
+    # Fit ulang kandidat terbaik pada seluruh data
+    model = RandomForestClassifier(**best["params"], random_state=random_state, n_jobs=jobs)
+    model.fit(df[FEATURE_COLUMNS], df[TARGET_COLUMN])
+    # n_jobs ikut di-pickle: worker web yang memakai model ini tidak boleh membuka
+    # satu thread joblib per core (beberapa worker gunicorn akan saling berebut CPU)
+    model.set_params(n_jobs=None)
+    model_bytes = save_model(model, model_path)
+    print(f"Model berhasil disimpan ke {model_path}")
+    export_model_arrays(model, model_bytes)
+
+    metrics = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "model_version": hashlib.sha256(model_bytes).hexdigest()[:12],
+        "dataset": {"path": csv_path, "sha256": dataset_hash, "rows": len(df),
+                    "class_distribution": {str(k): int(v) for k, v in df[TARGET_COLUMN].value_counts().items()}},
+        "cv": {"n_splits": n_splits, "shuffle": True, "random_state": random_state, "scoring": scoring},
+        "search": {"candidates": len(param_list), "n_iter": n_iter, "jobs": jobs,
+                   "cached_folds": len(fold_results) - len(pending),
+                   "seconds": round(search_seconds, 2)},
+        "best": best,
+        "results": summary,
+    }
+    _write_json(metrics_path, metrics)
+    print(f"Metrics disimpan ke {metrics_path}")
+    return model, metrics
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python app/train_model.py --search")
+    parser.add_argument("--search", action="store_true")
+    parser.add_argument("--csv", default="app/tpq_dataset.csv", help="Dataset training")
+    parser.add_argument("--grid", help="File JSON berisi ruang parameter (default: DEFAULT_PARAM_GRID)")
+    parser.add_argument("--n-iter", type=int, help="Random search dengan N kandidat (default: seluruh grid)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, help="Jumlah proses (default: jumlah core)")
+    parser.add_argument("--scoring", default="accuracy", choices=SCORING)
+    parser.add_argument("--cache-dir", default=SEARCH_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    run_search(
+        args.csv,
+        param_grid=load_param_grid(args.grid),
+        n_iter=args.n_iter,
+        n_splits=args.folds,
+        jobs=args.jobs,
+        scoring=args.scoring,
+        cache_dir=args.cache_dir,
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -46,6 +46,13 @@ class Student(Base):
 
     orang_tua = relationship("User")
 
+    # Index komposit untuk filter + keyset pagination (WHERE kolom = ? AND id > ? ORDER BY id)
+    __table_args__ = (
+        Index("ix_students_kelas_id", "kelas", "id"),
+        Index("ix_students_kategori_id", "kategori", "id"),
+        Index("ix_students_orang_tua_id_id", "orang_tua_id", "id"),
+    )
+
 # Table untuk menyimpan informasi kegiatan
 class Kegiatan(Base):
     __tablename__ = "kegiatan"
@@ -82,4 +89,50 @@ class Pengumuman(Base):
 
     # Foreign key untuk mengaitkan dengan User (admin)
     admin_id = Column(Integer, ForeignKey("users.id"))
-    admin = relationship("User")  # Relasi ke User sebagai admin Pengumuman
\ No newline at end of file
+    admin = relationship("User")  # Relasi ke User sebagai admin Pengumuman
+
+# Agregat per kelas (jumlah siswa, total nilai per mapel, jumlah per kategori).
+# Diperbarui otomatis setiap insert/update/delete siswa, lihat kelas_stats.py
+class KelasStats(Base):
+    __tablename__ = "kelas_stats"
+
+    kelas = Column(String, primary_key=True)
+    jumlah_siswa = Column(Integer, nullable=False, default=0)
+    total_rata_rata = Column(Float, nullable=False, default=0.0)
+
+    # Total nilai 12 mata pelajaran
+    total_al_quran_iqro = Column(Integer, nullable=False, default=0)
+    total_hafalan_surat_pendek = Column(Integer, nullable=False, default=0)
+    total_hafalan_doa = Column(Integer, nullable=False, default=0)
+    total_hafalan_ayat_pilihan = Column(Integer, nullable=False, default=0)
+    total_bahasa_arab = Column(Integer, nullable=False, default=0)
+    total_bahasa_inggris = Column(Integer, nullable=False, default=0)
+    total_khat_menulis = Column(Integer, nullable=False, default=0)
+    total_menggambar_mewarnai = Column(Integer, nullable=False, default=0)
+    total_jasmani_kesehatan = Column(Integer, nullable=False, default=0)
+    total_kreativitas_keaktifan = Column(Integer, nullable=False, default=0)
+    total_ulumul_quran = Column(Integer, nullable=False, default=0)
+    total_kemampuan_berbahasa = Column(Integer, nullable=False, default=0)
+
+    # Jumlah siswa per kategori
+    jumlah_bsb = Column(Integer, nullable=False, default=0)
+    jumlah_bsh = Column(Integer, nullable=False, default=0)
+    jumlah_mb = Column(Integer, nullable=False, default=0)
+    jumlah_bb = Column(Integer, nullable=False, default=0)
+
+# Log setiap prediksi model: siapa yang meminta, input, hasil, versi model dan latency.
+# Ditulis per batch oleh background writer, lihat prediction_log.py
+class PredictionLog(Base):
+    __tablename__ = "prediction_logs"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False, index=True)  # UTC
+    user_id = Column(Integer, index=True)  # Tanpa foreign key agar log tetap ada walau user dihapus
+    username = Column(String)
+    endpoint = Column(String, nullable=False)  # /predict atau /predict/batch
+    student_id = Column(Integer)  # Hanya jika prediksi memakai student_ids
+    inputs = Column(String, nullable=False)  # JSON 12 nilai dengan urutan FEATURE_NAMES
+    kategori = Column(String, nullable=False)
+    margin = Column(Float)
+    model_version = Column(String, nullable=False)
+    latency_ms = Column(Float, nullable=False)  # Waktu proses request prediksi
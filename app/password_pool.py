@@ -0,0 +1,133 @@
+# file: app/password_pool.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from starlette.concurrency import run_in_threadpool
+from . import auth
+
+# bcrypt dijalankan di process pool terpisah agar tidak memenuhi threadpool
+# dan GIL yang dipakai route lain. 0 = pakai threadpool biasa.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Maksimal request yang menunggu giliran di luar yang sedang diproses, lebih dari itu 429
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+# Batas waktu menunggu hasil hashing, lebih dari itu 503
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+# Prioritas CPU worker hashing diturunkan agar route lain tetap didahulukan scheduler OS
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))
+
+def _init_worker(nice):
+    # os.nice hanya ada di Unix; di Windows prioritas worker dibiarkan
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+class PasswordPoolFull(Exception):
+    """Antrian hashing penuh, request ditolak sebelum masuk pool"""
+
+class PasswordPoolTimeout(Exception):
+    """Hashing tidak selesai dalam PASSWORD_HASH_TIMEOUT_SECONDS"""
+
+class PasswordPool:
+    """
+    Process pool berukuran tetap untuk bcrypt dengan admission control:
+    paling banyak workers + queue_size pekerjaan sekaligus, sisanya langsung
+    ditolak sehingga lonjakan login tidak menumpuk tanpa batas.
+    """
+
+    def __init__(self, workers, queue_size, timeout, nice=0):
+        self.workers = workers
+        self.nice = nice
+        self.capacity = max(workers, 1) + queue_size
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_executor(self):
+        # Dibuat saat pertama dipakai; "spawn" agar worker tidak mewarisi thread event loop
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.nice,),
+                )
+            return self._executor
+
+    def _admit(self):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise PasswordPoolFull()
+            self.in_flight += 1
+
+    def _release(self, *args):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _submit(self, fn, *args):
+        """Submit ke executor, kembalikan (executor, future)"""
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Worker mati (misalnya OOM atau di-kill); pool dibuat ulang sekali
+            self._discard_executor(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(fn, *args)
+
+    def _job_done(self, future, executor):
+        self._release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def _discard_executor(self, executor):
+        # Hanya executor yang rusak; yang sudah dibuat ulang request lain dibiarkan
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        self._admit()
+        if self.workers > 0:
+            try:
+                executor, future = self._submit(fn, *args)
+            except Exception:
+                self._release()
+                raise
+            # Slot baru dilepas saat proses benar-benar selesai, juga setelah timeout
+            future.add_done_callback(lambda done: self._job_done(done, executor))
+            waiter = asyncio.wrap_future(future)
+        else:
+            waiter = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            waiter.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordPoolTimeout()
+
+    async def hash(self, password):
+        return await self.run(auth.get_password_hash, password)
+
+    async def verify(self, plain_password, hashed_password):
+        return await self.run(auth.verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_pool = PasswordPool(
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_TIMEOUT_SECONDS, PASSWORD_HASH_NICE
+)
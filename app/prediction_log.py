@@ -0,0 +1,142 @@
+# file: app/prediction_log.py
+import asyncio
+import collections
+import json
+import os
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from . import models
+from .database import open_session, write_queue
+
+# 0 = prediksi tidak dicatat
+PREDICTION_LOG_ENABLED = os.getenv("PREDICTION_LOG_ENABLED", "1") == "1"
+# Maksimal record yang menunggu ditulis; jika penuh record baru dibuang (dihitung di stats)
+PREDICTION_LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", "10000"))
+# Satu insert + commit setiap N record terkumpul, atau paling lambat setiap T ms
+PREDICTION_LOG_BATCH_SIZE = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", "200"))
+PREDICTION_LOG_FLUSH_MS = float(os.getenv("PREDICTION_LOG_FLUSH_MS", "500"))
+
+def _insert_records(session, records):
+    session.execute(insert(models.PredictionLog), records)
+    session.commit()
+
+class PredictionLogWriter:
+    """
+    Background writer untuk tabel prediction_logs.
+
+    Route hanya menambahkan record ke buffer berukuran tetap (tanpa I/O dan
+    tanpa membangunkan task lain per record). Sebuah task di event loop bangun
+    setiap flush_ms atau saat buffer mencapai batch_size, lalu menulis per batch
+    dengan satu executemany + commit lewat session route dan antrian penulis
+    tunggal (write_queue). Saat shutdown sisa buffer ditulis dulu.
+    record() dipanggil dari event loop (route async).
+    """
+
+    def __init__(self, enabled, queue_size, batch_size, flush_ms):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_ms / 1000
+        self._buffer = collections.deque()
+        self._wakeup = None
+        self._task = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _start(self):
+        # Task dibuat saat record pertama masuk, di event loop yang sedang berjalan
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def record(self, **fields):
+        """Tambahkan satu record tanpa menunggu; jika buffer penuh record dibuang"""
+        if not self.enabled or self._closed:
+            return
+        if self._task is None:
+            self._start()
+        if len(self._buffer) >= self.queue_size:
+            self.dropped += 1
+            return
+        self._buffer.append(fields)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def write(self, records):
+        """Tulis satu batch record dalam satu transaksi (insert dan commit di dalam write_queue)"""
+        db = open_session()
+        try:
+            await write_queue.run(db.run_sync, _insert_records, records)
+        except Exception as e:
+            self.failed += len(records)
+            print(f"Gagal menulis {len(records)} log prediksi: {e}")
+            return
+        finally:
+            await db.close()
+        self.written += len(records)
+        self.batches += 1
+
+    async def _drain(self):
+        while self._buffer:
+            batch = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            await self.write(batch)
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._drain()
+        # Sisa record yang masuk sebelum ditutup
+        await self._drain()
+
+    async def shutdown(self, timeout=10):
+        """Tolak record baru lalu tunggu semua record di buffer selesai ditulis"""
+        self._closed = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            print(f"Log prediksi belum selesai ditulis dalam {timeout} detik, {len(self._buffer)} dibuang")
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "queued": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+writer = PredictionLogWriter(
+    PREDICTION_LOG_ENABLED, PREDICTION_LOG_QUEUE_SIZE, PREDICTION_LOG_BATCH_SIZE, PREDICTION_LOG_FLUSH_MS
+)
+
+def log_predictions(principal, endpoint, score_rows, details, model_version, latency_ms, student_ids=None):
+    """Catat hasil prediksi (satu record per siswa) ke writer"""
+    if not writer.enabled:
+        return
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    student_ids = student_ids or [None] * len(details)
+    for scores, detail, student_id in zip(score_rows, details, student_ids):
+        writer.record(
+            created_at=created_at,
+            user_id=principal.id,
+            username=principal.username,
+            endpoint=endpoint,
+            student_id=student_id,
+            inputs=json.dumps([int(score) for score in scores]),
+            kategori=detail["kategori"],
+            margin=detail.get("margin"),
+            model_version=model_version,
+            latency_ms=round(latency_ms, 3),
+        )
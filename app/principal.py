@@ -0,0 +1,65 @@
+# file: app/principal.py
+import os
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from . import models
+from .lru_cache import LRUCache
+
+# Cache user yang sudah login, key = subject token (username). 0 = nonaktif
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+class Principal:
+    """
+    Identitas user yang sedang request (id, username, role).
+    Objek biasa, bukan ORM, sehingga aman disimpan di cache lintas session.
+    """
+
+    def __init__(self, id, username, role):
+        self.id = id
+        self.username = username
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(id=user.id, username=user.username, role=user.role)
+
+    @classmethod
+    def from_claims(cls, payload):
+        """Principal dari isi token saja, tanpa query DB (id bisa None untuk token lama)"""
+        return cls(id=payload.get("uid"), username=payload.get("sub"), role=payload.get("role"))
+
+user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+def invalidate_user(username):
+    user_cache.pop(username)
+
+# Invalidasi otomatis setiap kali baris users diubah atau dihapus lewat ORM.
+# Username dikumpulkan saat flush lalu dihapus dari cache setelah commit: request lain
+# yang membaca baris lama sebelum commit tidak bisa menaruhnya kembali ke cache.
+_PENDING_KEY = "invalidate_usernames"
+
+def _pending_usernames(session):
+    return session.info.setdefault(_PENDING_KEY, set())
+
+@event.listens_for(models.User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    pending = _pending_usernames(inspect(target).session)
+    pending.add(target.username)
+    # Jika username diganti, hapus juga entry untuk username lama
+    pending.update(inspect(target).attrs.username.history.deleted)
+
+@event.listens_for(models.User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    _pending_usernames(inspect(target).session).add(target.username)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for username in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(username)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_rolled_back_users(session, transaction):
+    # Transaksi terluar selesai tanpa commit (rollback): baris di DB tidak berubah
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,62 @@
+# file: app/sqlite_tuning.py
+import asyncio
+import os
+import threading
+from sqlalchemy import event
+
+# Mode performa SQLite: WAL + pragma + satu antrian penulis. SQLITE_TUNING=0 mematikan semuanya.
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "1") == "1"
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # Negatif = dalam KiB (64 MB)
+SQLITE_SINGLE_WRITER = os.getenv("SQLITE_SINGLE_WRITER", "1") == "1"
+
+def sqlite_pragmas():
+    return [
+        f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={SQLITE_CACHE_SIZE}",
+    ]
+
+def apply_sqlite_pragmas(engine):
+    """Set pragma di setiap koneksi baru (engine sync atau async_engine.sync_engine)"""
+    if not SQLITE_TUNING or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+class WriteQueue:
+    """
+    Antrian penulis tunggal: semua commit dalam satu proses dijalankan bergiliran
+    (FIFO). Dengan WAL pembaca tidak pernah menunggu penulis, dan penulis tidak
+    saling berebut lock database sehingga tidak muncul "database is locked".
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self._thread_lock = threading.Lock()
+        self._locks = {}  # event loop -> asyncio.Lock
+
+    def _lock(self):
+        loop = asyncio.get_running_loop()
+        with self._thread_lock:
+            lock = self._locks.get(loop)
+            if lock is None:
+                lock = self._locks[loop] = asyncio.Lock()
+            return lock
+
+    async def run(self, fn, *args):
+        """Jalankan coroutine function penulis di dalam antrian"""
+        if not self.enabled:
+            return await fn(*args)
+        async with self._lock():
+            return await fn(*args)
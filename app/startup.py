@@ -0,0 +1,111 @@
+# file: app/startup.py
+# Startup dan shutdown app lewat FastAPI lifespan.
+#
+# Import app.main hanya memuat FastAPI, SQLAlchemy dan numpy; tidak ada query DB
+# maupun load model saat import. Setelah proses start:
+# 1. create_all dan kelas_stats (cepat, selalu selesai sebelum request pertama)
+# 2. warm-up: load model (unpickle menarik sklearn), import pandas untuk
+#    /students/import dan start inference pool. STARTUP_WARMUP=background (default) di thread terpisah,
+#    GET /ready mengembalikan 503 sampai selesai; blocking = sebelum request
+#    pertama; off = baru dikerjakan saat pertama dipakai.
+# Request /predict yang datang sebelum warm-up selesai ikut menunggu load model
+# yang sama (ml_model.ensure_model_loaded), bukan gagal.
+import importlib
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from . import kelas_stats, prediction_log
+from .database import init_db, open_session, write_queue
+from .inference_pool import inference_pool
+from .ml_model import MODEL_WATCH_INTERVAL_SECONDS, ensure_model_loaded, registry
+from .password_pool import password_pool
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background")
+
+class Readiness:
+    """Status startup per worker untuk GET /ready"""
+
+    def __init__(self):
+        self.database = False
+        self.warmup = "pending"  # pending, running, done, failed, off
+        self.warmup_seconds = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.database and self.warmup in ("done", "failed", "off")
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "database": self.database,
+            "warmup": self.warmup,
+            "warmup_seconds": self.warmup_seconds,
+            "model_loaded": registry.current is not None,
+            "error": self.error,
+        }
+
+readiness = Readiness()
+
+async def prepare_database():
+    """create_all lalu isi kelas_stats jika perlu; idempotent, aman di setiap worker"""
+    await init_db()
+    # Database lama yang belum punya isi kelas_stats dibangun sekali dari tabel students
+    db = open_session()
+    try:
+        await write_queue.run(db.run_sync, kelas_stats.ensure_built)
+    finally:
+        await db.close()
+    readiness.database = True
+
+def warm_up(serving=True):
+    """
+    Load model, import modul berat dan start inference pool. Idempotent.
+    serving=False (master gunicorn sebelum fork) hanya load model dan import;
+    status dan process pool dibiarkan untuk lifespan di setiap worker.
+    """
+    if not serving:
+        ensure_model_loaded()
+        importlib.import_module(".student_import", __package__)
+        return
+    with readiness._lock:
+        if readiness.warmup in ("done", "running"):
+            return
+        readiness.warmup = "running"
+    started = time.perf_counter()
+    try:
+        # Model yang tidak ditemukan bukan error startup, /predict mengembalikan error seperti biasa
+        ensure_model_loaded()
+        importlib.import_module(".student_import", __package__)
+        inference_pool.start()
+    except Exception as e:
+        readiness.error = str(e)
+        readiness.warmup = "failed"
+        print(f"Warm-up gagal: {e}")
+        return
+    finally:
+        readiness.warmup_seconds = round(time.perf_counter() - started, 3)
+    readiness.warmup = "done"
+    print(f"Warm-up selesai dalam {readiness.warmup_seconds} detik")
+
+@asynccontextmanager
+async def lifespan(app):
+    await prepare_database()
+    if STARTUP_WARMUP == "blocking":
+        await run_in_threadpool(warm_up)
+    elif STARTUP_WARMUP == "background":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        readiness.warmup = "off"
+    # Hot-reload student_model.pkl jika MODEL_WATCH_INTERVAL_SECONDS > 0
+    registry.watch(MODEL_WATCH_INTERVAL_SECONDS)
+    try:
+        yield
+    finally:
+        password_pool.shutdown()
+        inference_pool.shutdown()
+        # Log prediksi yang masih di queue ditulis sebelum proses berhenti
+        await prediction_log.writer.shutdown()
@@ -0,0 +1,182 @@
+# file: app/student_import.py
+# Import siswa massal dari CSV/Excel (.xlsx) dengan layout yang sama seperti tpq_dataset.csv
+# (ID, Nama, Kelas, 12 mata pelajaran, Rata_Rata, Kategori). Kolom opsional:
+# Tanggal_Lahir, Jenis_Kelamin, No_HP, Nama_Orang_Tua, Orang_Tua_ID.
+# Rata_Rata dan Kategori dari file diabaikan, selalu dihitung ulang.
+#
+# CLI: python -m app.student_import data.csv --orang-tua-id 2 [--predict]
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from . import models, kelas_stats
+
+# Jumlah baris per transaksi insert
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+SUBJECT_FIELDS = kelas_stats.SUBJECT_FIELDS
+TEXT_FIELDS = ["tanggal_lahir", "jenis_kelamin", "no_hp", "nama_orang_tua"]
+COLUMN_ALIASES = {"nama": "name"}
+
+def read_table(data, filename=""):
+    """Baca isi file upload menjadi DataFrame; .xlsx dibaca dengan openpyxl"""
+    name = filename.lower()
+    if name.endswith(".xls"):
+        # Format Excel lama butuh xlrd yang tidak ada di requirements
+        raise ValueError("Format .xls tidak didukung, simpan sebagai .xlsx atau .csv")
+    if name.endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(data), engine="openpyxl")
+    return pd.read_csv(io.BytesIO(data))
+
+def calculate_average_and_category_batch(scores):
+    """
+    Versi vektor dari calculate_average_and_category di main.py:
+    kategori ditentukan dari rata-rata sebelum dibulatkan.
+    """
+    rata_rata = scores.mean(axis=1)
+    kategori = np.select(
+        [rata_rata >= 85, rata_rata >= 70, rata_rata >= 60],
+        ["BSB", "BSH", "MB"],
+        default="BB",
+    )
+    return np.round(rata_rata, 2), kategori
+
+def prepare_rows(df, orang_tua_id=None, known_user_ids=None):
+    """
+    Validasi semua baris sekaligus.
+    Mengembalikan (mappings siap insert, nomor baris untuk setiap mapping,
+    matrix nilai, daftar error per baris). Nomor baris = baris di file (header = 1).
+    Raise ValueError jika kolom wajib tidak ada.
+    """
+    df = df.rename(columns=lambda column: str(column).strip().lower())
+    df = df.rename(columns=COLUMN_ALIASES)
+    missing = [column for column in ["name", "kelas", *SUBJECT_FIELDS] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+
+    df = df.reset_index(drop=True)
+    row_numbers = df.index.to_numpy() + 2
+    errors = {}
+
+    def flag(mask, message):
+        for index in np.flatnonzero(mask):
+            errors.setdefault(int(index), []).append(message)
+
+    scores = df[SUBJECT_FIELDS].apply(pd.to_numeric, errors="coerce")
+    invalid_scores = scores.isna() | (scores < 0) | (scores > 100) | (scores % 1 != 0)
+    for field in SUBJECT_FIELDS:
+        flag(invalid_scores[field].to_numpy(), f"{field} harus bilangan bulat 0-100")
+
+    for field in ["name", "kelas"]:
+        values = df[field].astype("string").str.strip()
+        flag((values.isna() | (values == "")).to_numpy(), f"{field} wajib diisi")
+
+    if "orang_tua_id" in df.columns:
+        parent_ids = pd.to_numeric(df["orang_tua_id"], errors="coerce")
+        if orang_tua_id is not None:
+            parent_ids = parent_ids.fillna(orang_tua_id)
+    else:
+        parent_ids = pd.Series(orang_tua_id, index=df.index, dtype="float64")
+    flag((parent_ids.isna() | (parent_ids % 1 != 0)).to_numpy(), "orang_tua_id wajib diisi")
+    if known_user_ids is not None:
+        unknown = parent_ids.notna() & ~parent_ids.isin(list(known_user_ids))
+        flag(unknown.to_numpy(), "orang_tua_id tidak terdaftar")
+
+    valid = np.ones(len(df), dtype=bool)
+    valid[list(errors)] = False
+
+    score_matrix = scores[valid].to_numpy(dtype=np.int64)
+    rata_rata, kategori = calculate_average_and_category_batch(score_matrix)
+
+    valid_df = df[valid]
+    columns = {
+        "name": valid_df["name"].astype(str).str.strip(),
+        "kelas": valid_df["kelas"].astype(str).str.strip(),
+    }
+    for field in TEXT_FIELDS:
+        columns[field] = valid_df[field].fillna("").astype(str) if field in valid_df.columns else ""
+    table = pd.DataFrame(columns, index=valid_df.index)
+    table[SUBJECT_FIELDS] = score_matrix
+    table["rata_rata"] = rata_rata
+    table["kategori"] = kategori
+    table["orang_tua_id"] = parent_ids[valid].astype(np.int64)
+
+    row_errors = [
+        {"row": int(row_numbers[index]), "errors": messages}
+        for index, messages in sorted(errors.items())
+    ]
+    return table.to_dict("records"), row_numbers[valid].tolist(), score_matrix, row_errors
+
+def parent_ids_in(df):
+    """ID orang tua yang dirujuk file, untuk dicek keberadaannya dengan satu query"""
+    df = df.rename(columns=lambda column: str(column).strip().lower())
+    if "orang_tua_id" not in df.columns:
+        return set()
+    ids = pd.to_numeric(df["orang_tua_id"], errors="coerce").dropna()
+    return {int(value) for value in ids.unique() if value % 1 == 0}
+
+def save_chunk(session, mappings):
+    """
+    Insert satu chunk (executemany) + update agregat kelas_stats lalu commit.
+    Jika gagal chunk di-rollback dan pesan error dikembalikan, selain itu None.
+    """
+    try:
+        session.bulk_insert_mappings(models.Student, mappings)
+        kelas_stats.apply_deltas(session.connection(), kelas_stats.deltas_for_mappings(mappings))
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        return str(getattr(e, "orig", None) or e)
+    return None
+
+def chunks(items, size=IMPORT_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+def chunk_failed(row_errors, row_numbers, start, size, error):
+    for row in row_numbers[start:start + size]:
+        row_errors.append({"row": row, "errors": [f"Gagal disimpan: {error}"]})
+    row_errors.sort(key=lambda row_error: row_error["row"])
+
+if __name__ == "__main__":
+    from .database import SessionLocal
+
+    args = sys.argv[1:]
+    if not args or args[0].startswith("-"):
+        print("Penggunaan: python -m app.student_import data.csv [--orang-tua-id N] [--predict]")
+        sys.exit(2)
+    path = args[0]
+    default_parent = int(args[args.index("--orang-tua-id") + 1]) if "--orang-tua-id" in args else None
+
+    with open(path, "rb") as f:
+        df = read_table(f.read(), path)
+
+    db = SessionLocal()
+    try:
+        referenced = parent_ids_in(df) | ({default_parent} if default_parent is not None else set())
+        known = set(db.scalars(select(models.User.id).where(models.User.id.in_(referenced))))
+        mappings, row_numbers, scores, row_errors = prepare_rows(df, default_parent, known)
+
+        imported = []
+        for start, chunk in chunks(mappings):
+            error = save_chunk(db, chunk)
+            if error:
+                chunk_failed(row_errors, row_numbers, start, len(chunk), error)
+            else:
+                imported.extend(range(start, start + len(chunk)))
+
+        for row_error in row_errors:
+            print(f"Baris {row_error['row']}: {'; '.join(row_error['errors'])}")
+        print(f"{len(imported)} siswa berhasil diimport, {len(row_errors)} baris gagal")
+
+        if "--predict" in args and imported:
+            from .ml_model import predict_performance_batch
+            predictions, version = predict_performance_batch(scores[imported])
+            print(f"Prediksi model versi {version}:")
+            for index, prediction in zip(imported, predictions):
+                print(f"  baris {row_numbers[index]}: {prediction}")
+    finally:
+        db.close()
@@ -1,27 +1,80 @@
 # file: app/train_model.py
+import hashlib
+import os
+import sys
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import pickle
 
-def train_model_with_csv(csv_file_path):
+try:
+    from .compiled_forest import CompiledForest
+    from .dataset_cache import load_dataset
+except ImportError:  # Dijalankan langsung: python app/train_model.py
+    from compiled_forest import CompiledForest
+    from dataset_cache import load_dataset
+
+MODEL_PATH = "app/student_model.pkl"
+MODEL_ARRAYS_DIR = "app/student_model_arrays"
+
+FEATURE_COLUMNS = [
+    'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
+    'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
+    'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa'
+]
+TARGET_COLUMN = 'Kategori'
+
+# Parameter model default (juga dipakai mode streaming)
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'random_state': 42,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+}
+
+def save_model(model, path=MODEL_PATH):
+    """
+    Simpan model ke pickle secara atomik (file sementara + os.replace) agar
+    server yang memantau file model tidak membaca file setengah jadi
+    """
+    data = pickle.dumps(model)
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+    return data
+
+def export_model_arrays(model, model_bytes, directory=MODEL_ARRAYS_DIR):
+    """
+    Export forest ke array .npy + manifest JSON yang bisa di-load read-only
+    dengan mmap (MODEL_FORMAT=mmap), sehingga semua worker berbagi memori fisik
+    yang sama. Versi artefak sama dengan hash file pickle-nya.
+    """
+    version = hashlib.sha256(model_bytes).hexdigest()[:12]
+    compiled = CompiledForest.from_sklearn(model)
+    manifest_path = compiled.save(directory, version, list(model.feature_names_in_))
+    print(f"Model arrays berhasil diexport ke {manifest_path} (versi {version})")
+    return manifest_path
+
+def export_existing_model(path=MODEL_PATH, directory=MODEL_ARRAYS_DIR):
+    """Export model pickle yang sudah ada tanpa training ulang"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return export_model_arrays(pickle.loads(data), data, directory)
+
+def train_model_with_csv(csv_file_path, model_path=MODEL_PATH, arrays_dir=MODEL_ARRAYS_DIR):
     """
     Train model menggunakan dataset CSV
     """
     try:
-        # Load dataset
+        # Load dataset (lewat cache kolumnar, lihat dataset_cache.py)
         print("Loading dataset...")
-        df = pd.read_csv(csv_file_path)
+        df = load_dataset(csv_file_path)
         print(f"Dataset loaded: {len(df)} rows")
         
         # Cek kolom yang diperlukan (sesuaikan dengan dataset Anda)
-        required_columns = [
-            'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
-            'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
-            'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa',
-            'Kategori'
-        ]
+        required_columns = FEATURE_COLUMNS + [TARGET_COLUMN]
         
         # Pastikan semua kolom ada
         missing_columns = [col for col in required_columns if col not in df.columns]
@@ -31,12 +84,8 @@ def train_model_with_csv(csv_file_path):
             return False
         
         # Prepare features dan target
-        X = df[[
-            'Al_Quran_Iqro', 'Hafalan_Surat_Pendek', 'Hafalan_Doa', 'Hafalan_Ayat_Pilihan',
-            'Bahasa_Arab', 'Bahasa_Inggris', 'Khat_Menulis', 'Menggambar_Mewarnai',
-            'Jasmani_Kesehatan', 'Kreativitas_Keaktifan', 'Ulumul_Quran', 'Kemampuan_Berbahasa'
-        ]]
-        y = df['Kategori']
+        X = df[FEATURE_COLUMNS]
+        y = df[TARGET_COLUMN]
         
         print(f"Features shape: {X.shape}")
         print(f"Target distribution:\n{y.value_counts()}")
@@ -46,13 +95,7 @@ def train_model_with_csv(csv_file_path):
         
         # Training model
         print("Training model...")
-        model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
+        model = RandomForestClassifier(**MODEL_PARAMS)
         model.fit(X_train, y_train)
         
         # Evaluasi model
@@ -68,10 +111,11 @@ def train_model_with_csv(csv_file_path):
         print(classification_report(y_test, y_pred))
         
         # Simpan model
-        with open("app/student_model.pkl", "wb") as f:
-            pickle.dump(model, f)
-        
-        print("Model berhasil disimpan ke app/student_model.pkl")
+        model_bytes = save_model(model, model_path)
+        print(f"Model berhasil disimpan ke {model_path}")
+
+        # Export format memory-mapped untuk MODEL_FORMAT=mmap
+        export_model_arrays(model, model_bytes, arrays_dir)
         return True
         
     except Exception as e:
@@ -135,6 +179,25 @@ def create_sample_data():
     return df
 
 if __name__ == "__main__":
+    # python app/train_model.py --export  -> hanya export model yang sudah ada ke format mmap
+    if "--export" in sys.argv[1:]:
+        export_existing_model()
+        sys.exit(0)
+
+    # python app/train_model.py --search [--grid grid.json] [--n-iter N] [--folds K] [--jobs N]
+    # -> hyperparameter search paralel + CV, lihat model_search.py
+    if "--search" in sys.argv[1:]:
+        from model_search import main as search_main
+        search_main(sys.argv[1:])
+        sys.exit(0)
+
+    # python app/train_model.py --streaming [--csv data.csv] [--memory-budget-mb N]
+    # -> training per chunk dengan memori terbatas, lihat train_streaming.py
+    if "--streaming" in sys.argv[1:]:
+        from train_streaming import main as streaming_main
+        streaming_main(sys.argv[1:])
+        sys.exit(0)
+
     # Path ke dataset CSV Anda
     # csv_path = "tpq_dataset.csv"  # Jika di root project
     csv_path = "app/tpq_dataset.csv"  # Jika di folder app/
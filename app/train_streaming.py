@@ -0,0 +1,175 @@
+# file: app/train_streaming.py
+# Training out-of-core untuk dataset riwayat nilai yang besar.
+#
+# CSV dibaca per chunk dengan dtype ringkas (nilai uint8, kategori sebagai kode
+# int8) langsung ke matrix yang sudah dialokasikan, tanpa pernah memegang seluruh
+# DataFrame. Jika matrix training melebihi memory budget, data dibagi ke beberapa
+# shard (satu pass baca CSV per shard), setiap shard melatih sebagian pohon dan
+# semua pohon digabung menjadi satu RandomForestClassifier.
+#
+# Jalankan dari root project:
+#   python app/train_model.py --streaming [--csv data.csv] [--memory-budget-mb 512] [--chunk-rows 100000]
+import os
+import time
+try:
+    import resource
+except ImportError:  # Windows: peak RSS tidak dilaporkan
+    resource = None
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import classification_report
+
+try:
+    from .train_model import (FEATURE_COLUMNS, MODEL_ARRAYS_DIR, MODEL_PARAMS, MODEL_PATH, TARGET_COLUMN,
+                              export_model_arrays, save_model)
+except ImportError:  # Dijalankan langsung: python app/train_model.py --streaming
+    from train_model import (FEATURE_COLUMNS, MODEL_ARRAYS_DIR, MODEL_PARAMS, MODEL_PATH, TARGET_COLUMN,
+                             export_model_arrays, save_model)
+
+TRAIN_MEMORY_BUDGET_MB = int(os.getenv("TRAIN_MEMORY_BUDGET_MB", "512"))
+TRAIN_CHUNK_ROWS = int(os.getenv("TRAIN_CHUNK_ROWS", "100000"))
+
+KATEGORI_DTYPE = pd.CategoricalDtype(["BB", "BSB", "BSH", "MB"])
+# Perkiraan memori per baris saat fit: matrix uint8 + label + salinan float32
+# di dalam sklearn + indeks/bobot bootstrap
+FIT_BYTES_PER_ROW = len(FEATURE_COLUMNS) * (1 + 4) + 1 + 8 + 16
+# Setiap baris ke-5 menjadi data uji (20%, sama seperti test_size=0.2)
+HOLDOUT_EVERY = 5
+
+def peak_rss_mb():
+    """Peak RSS proses ini dalam MB, None jika modul resource tidak ada"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def peak_rss_text():
+    rss = peak_rss_mb()
+    return f", peak RSS {rss:.0f} MB" if rss is not None else ""
+
+def count_rows(csv_path):
+    """Jumlah baris data (tanpa header) dengan membaca file per blok"""
+    lines = 0
+    last = b"\n"
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return lines - 1
+
+def read_chunks(csv_path, chunk_rows):
+    """Yield (nomor baris, nilai uint8, kode kategori int8) per chunk"""
+    dtypes = {column: np.uint8 for column in FEATURE_COLUMNS}
+    dtypes[TARGET_COLUMN] = KATEGORI_DTYPE
+    start = 0
+    reader = pd.read_csv(csv_path, usecols=FEATURE_COLUMNS + [TARGET_COLUMN], dtype=dtypes, chunksize=chunk_rows)
+    for chunk in reader:
+        codes = chunk[TARGET_COLUMN].cat.codes.to_numpy(np.int8)
+        if (codes < 0).any():
+            raise ValueError(f"Kategori kosong atau tidak dikenal di sekitar baris {start + 2}")
+        row_ids = np.arange(start, start + len(chunk), dtype=np.int64)
+        start += len(chunk)
+        yield row_ids, chunk[FEATURE_COLUMNS].to_numpy(), codes
+
+def is_holdout(row_ids):
+    return row_ids % HOLDOUT_EVERY == 0
+
+def shard_of(row_ids, n_shards):
+    # Hash perkalian agar setiap shard berisi sampel acak dari seluruh file
+    return (row_ids.astype(np.uint64) * np.uint64(0x9E3779B1) % np.uint64(2**32)) % np.uint64(n_shards)
+
+def shard_sizes(n_rows, n_shards, block=1 << 20):
+    sizes = np.zeros(n_shards, dtype=np.int64)
+    for start in range(0, n_rows, block):
+        row_ids = np.arange(start, min(start + block, n_rows), dtype=np.int64)
+        train_ids = row_ids[~is_holdout(row_ids)]
+        sizes += np.bincount(shard_of(train_ids, n_shards).astype(np.intp), minlength=n_shards)
+    return sizes
+
+def load_shard(csv_path, chunk_rows, shard, n_shards, size):
+    """Isi matrix shard langsung dari chunk CSV (dialokasikan sekali, tanpa concat)"""
+    X = np.empty((size, len(FEATURE_COLUMNS)), dtype=np.uint8)
+    y = np.empty(size, dtype=np.int8)
+    filled = 0
+    for row_ids, scores, codes in read_chunks(csv_path, chunk_rows):
+        keep = ~is_holdout(row_ids) & (shard_of(row_ids, n_shards) == shard)
+        n = int(keep.sum())
+        X[filled:filled + n] = scores[keep]
+        y[filled:filled + n] = codes[keep]
+        filled += n
+    return X[:filled], y[:filled]
+
+def trees_per_shard(n_estimators, n_shards):
+    base, extra = divmod(n_estimators, n_shards)
+    return [max(1, base + (1 if shard < extra else 0)) for shard in range(n_shards)]
+
+def evaluate(model, csv_path, chunk_rows):
+    """Akurasi pada data uji, dihitung per chunk"""
+    y_true, y_pred = [], []
+    for row_ids, scores, codes in read_chunks(csv_path, chunk_rows):
+        holdout = is_holdout(row_ids)
+        if not holdout.any():
+            continue
+        X = pd.DataFrame(scores[holdout], columns=FEATURE_COLUMNS)
+        y_true.append(KATEGORI_DTYPE.categories.take(codes[holdout]))
+        y_pred.append(model.predict(X))
+    y_true = np.concatenate(y_true)
+    y_pred = np.concatenate(y_pred)
+    return float((y_true == y_pred).mean()), classification_report(y_true, y_pred)
+
+def train_model_streaming(csv_path, memory_budget_mb=TRAIN_MEMORY_BUDGET_MB, chunk_rows=TRAIN_CHUNK_ROWS,
+                          model_path=MODEL_PATH, arrays_dir=MODEL_ARRAYS_DIR):
+    started = time.perf_counter()
+    n_rows = count_rows(csv_path)
+    n_train = n_rows - (n_rows + HOLDOUT_EVERY - 1) // HOLDOUT_EVERY
+    budget_rows = max(1, memory_budget_mb * 1024 * 1024 // FIT_BYTES_PER_ROW)
+    n_shards = max(1, -(-n_train // budget_rows))
+    print(f"Dataset: {n_rows} baris ({n_train} training), budget {memory_budget_mb} MB "
+          f"= {budget_rows} baris per shard -> {n_shards} shard")
+
+    params = dict(MODEL_PARAMS)
+    n_estimators = params.pop("n_estimators")
+    random_state = params.pop("random_state")
+    sizes = shard_sizes(n_rows, n_shards)
+    model = None
+
+    for shard, n_trees in enumerate(trees_per_shard(n_estimators, n_shards)):
+        X, y = load_shard(csv_path, chunk_rows, shard, n_shards, int(sizes[shard]))
+        forest = RandomForestClassifier(n_estimators=n_trees, random_state=random_state + shard, **params)
+        forest.fit(pd.DataFrame(X, columns=FEATURE_COLUMNS, copy=False), KATEGORI_DTYPE.categories.take(y))
+        del X, y
+        print(f"Shard {shard + 1}/{n_shards}: {n_trees} pohon{peak_rss_text()}")
+
+        if model is None:
+            model = forest
+        elif not np.array_equal(model.classes_, forest.classes_):
+            raise ValueError("Shard tidak berisi semua kategori, perbesar --memory-budget-mb")
+        else:
+            model.estimators_ += forest.estimators_
+            model.n_estimators = len(model.estimators_)
+
+    test_accuracy, report = evaluate(model, csv_path, chunk_rows)
+    print(f"Testing Accuracy: {test_accuracy:.4f}")
+    print("\nClassification Report:")
+    print(report)
+
+    model_bytes = save_model(model, model_path)
+    print(f"Model berhasil disimpan ke {model_path}")
+    export_model_arrays(model, model_bytes, arrays_dir)
+
+    print(f"Waktu training: {time.perf_counter() - started:.1f} s{peak_rss_text()}")
+    return model
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python app/train_model.py --streaming")
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--csv", default="app/tpq_dataset.csv")
+    parser.add_argument("--memory-budget-mb", type=int, default=TRAIN_MEMORY_BUDGET_MB)
+    parser.add_argument("--chunk-rows", type=int, default=TRAIN_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    train_model_streaming(args.csv, args.memory_budget_mb, args.chunk_rows)
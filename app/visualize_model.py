@@ -8,6 +8,8 @@ import numpy as np
 import os
 import seaborn as sns
 
+from dataset_cache import load_dataset
+
 os.makedirs("visualizations", exist_ok=True)
 
 # lanjutkan proses visualisasi...
@@ -19,7 +21,7 @@ os.makedirs("visualizations", exist_ok=True)
 
 # === Load model dan data ===
 model = joblib.load("app/student_model.pkl")
-data = pd.read_csv("app/tpq_dataset.csv")  # Dataset asli
+data = load_dataset("app/tpq_dataset.csv")  # Dataset asli (lewat cache kolumnar)
 X = data.drop(columns=["Kategori", "ID", "Nama", "Kelas", "Rata_Rata"])# hapus kolom non-fitur
 y = data["Kategori"]
 
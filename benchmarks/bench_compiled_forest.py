@@ -0,0 +1,39 @@
+# file: benchmarks/bench_compiled_forest.py
+# Bandingkan model.predict sklearn dengan CompiledForest untuk 1, 100 dan 10k baris,
+# sekaligus memastikan hasil prediksi identik pada dataset training.
+# Jalankan dari root project: python -m benchmarks.bench_compiled_forest
+import time
+import numpy as np
+import pandas as pd
+
+from app import ml_model
+
+def check_exact_match(loaded, csv_path):
+    X = pd.read_csv(csv_path)[ml_model.FEATURE_NAMES].to_numpy(np.float32)
+    expected = loaded.model.predict(X)
+    actual = loaded.compiled.predict(X)
+    mismatch = int((expected != actual).sum())
+    print(f"{csv_path}: {len(X)} baris, {mismatch} prediksi berbeda")
+    assert mismatch == 0
+
+def measure(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+if __name__ == "__main__":
+    loaded = ml_model.current_model()
+    check_exact_match(loaded, "app/tpq_dataset.csv")
+    check_exact_match(loaded, "app/sample_dataset.csv")
+
+    rng = np.random.default_rng(42)
+    for n_rows, repeat in [(1, 200), (100, 100), (1_000, 20), (10_000, 5)]:
+        X = rng.integers(0, 101, size=(n_rows, len(ml_model.FEATURE_NAMES))).astype(np.float32)
+        sklearn_ms = measure(lambda: loaded.model.predict(X), repeat)
+        compiled_ms = measure(lambda: loaded.compiled.predict(X), repeat)
+        print(
+            f"{n_rows:>6} baris  sklearn {sklearn_ms:9.3f} ms   compiled {compiled_ms:9.3f} ms"
+            f"   speedup {sklearn_ms / compiled_ms:5.1f}x"
+        )
@@ -0,0 +1,38 @@
+# file: benchmarks/bench_dataset_cache.py
+# Bandingkan pd.read_csv biasa dengan load_dataset (cache .npz kolumnar):
+# waktu load dan memori DataFrame. "dingin" = konversi pertama (parse CSV +
+# tulis cache), "hangat" = CSV tidak berubah sehingga langsung baca cache.
+# Jalankan dari root project:
+#   python -m benchmarks.bench_dataset_cache [jumlah_baris]
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_train_memory import generate_csv
+import dataset_cache  # noqa: E402  (folder app sudah ada di sys.path lewat bench_train_memory)
+from train_model import FEATURE_COLUMNS, TARGET_COLUMN  # noqa: E402
+
+def measure(label, load):
+    start = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - start
+    memory_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{label:<22} {seconds:8.2f} s   {memory_mb:9.1f} MB")
+    return seconds
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workdir = tempfile.mkdtemp(prefix="salma-dataset-")
+    csv_path = os.path.join(workdir, "history.csv")
+    generate_csv(csv_path, n_rows)
+    print(f"{n_rows} baris, {os.path.getsize(csv_path) / 1e6:.0f} MB CSV")
+
+    baseline = measure("pd.read_csv", lambda: pd.read_csv(csv_path))
+    measure("load_dataset dingin", lambda: dataset_cache.load_dataset(csv_path))
+    warm = measure("load_dataset hangat", lambda: dataset_cache.load_dataset(csv_path))
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN]
+    subset = measure("hangat, kolom training", lambda: dataset_cache.load_dataset(csv_path, columns))
+    print(f"Load hangat {baseline / warm:.1f}x, kolom training saja {baseline / subset:.1f}x lebih cepat dari pd.read_csv")
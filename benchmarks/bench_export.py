@@ -0,0 +1,69 @@
+# file: benchmarks/bench_export.py
+# Peak RSS server dan time-to-first-byte untuk 100k siswa sintetis:
+# GET /students (list JSON biasa) vs GET /export/students (NDJSON/CSV streaming).
+# Setiap endpoint diukur di server baru karena VmHWM (peak RSS) tidak bisa di-reset.
+# Jalankan dari root project: python -m benchmarks.bench_export [jumlah_siswa]
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+from app import models
+from benchmarks.loadgen import SUBJECT_FIELDS, admin_token, run_server
+
+def seed_database(workdir, count):
+    """Isi sql_app.db langsung dengan executemany (jauh lebih cepat dari lewat API)"""
+    path = os.path.join(workdir, "sql_app.db")
+    models.Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+    columns = ["name", "kelas", "tanggal_lahir", "jenis_kelamin", "no_hp", "nama_orang_tua",
+               *SUBJECT_FIELDS, "rata_rata", "kategori", "orang_tua_id"]
+    rows = (
+        (f"Siswa {i}", f"I.{i % 5 + 1}", "2018-01-01", "Perempuan", "08123456789", f"Orang Tua {i}",
+         *[50 + (i * 7 + n * 3) % 50 for n in range(12)], 74.5, "BSH", 1)
+        for i in range(count)
+    )
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            f"INSERT INTO students ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows
+        )
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+def measure(path, count, params=None):
+    workdir = tempfile.mkdtemp(prefix="salma-export-")
+    seed_database(workdir, count)
+    with run_server(workdir=workdir) as server:
+        token = admin_token(server.base_url)
+        baseline = peak_rss_mb(server.pid)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        start = time.perf_counter()
+        first_byte = None
+        size = 0
+        with httpx.stream("GET", server.base_url + path, params=params, headers=headers, timeout=600) as response:
+            for chunk in response.iter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                size += len(chunk)
+        total = time.perf_counter() - start
+
+        print(
+            f"{path + (' ' + str(params) if params else ''):<40} TTFB {first_byte * 1e3:9.1f} ms"
+            f"   total {total:6.2f} s   {size / 1e6:7.1f} MB"
+            f"   peak RSS +{peak_rss_mb(server.pid) - baseline:7.1f} MB"
+        )
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} siswa sintetis")
+    measure("/students", count)
+    measure("/export/students", count, {"format": "ndjson"})
+    measure("/export/students", count, {"format": "csv"})
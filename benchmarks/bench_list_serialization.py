@@ -0,0 +1,40 @@
+# file: benchmarks/bench_list_serialization.py
+# Latency GET /students (tanpa limit) untuk 1k/10k/100k siswa sintetis:
+# FAST_JSON_RESPONSES=0 (objek ORM + validasi response_model per baris) vs
+# FAST_JSON_RESPONSES=1 (kolom sebagai tuple, encode langsung dengan orjson).
+# Body kedua mode dibandingkan agar schema dipastikan sama.
+# Jalankan dari root project: python -m benchmarks.bench_list_serialization [jumlah_siswa,...] [ulangan]
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_export import seed_database
+from benchmarks.loadgen import admin_token, run_server
+
+def measure(workdir, env, repeat):
+    with run_server(env, workdir=workdir) as server:
+        headers = {"Authorization": f"Bearer {admin_token(server.base_url)}"}
+        with httpx.Client(base_url=server.base_url, headers=headers, timeout=600) as client:
+            client.get("/students")  # pemanasan
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = client.get("/students")
+                timings.append(time.perf_counter() - start)
+    return statistics.median(timings), response.json()
+
+if __name__ == "__main__":
+    counts = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1_000, 10_000, 100_000]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print(f"{'siswa':>8}  {'pydantic':>12}  {'orjson':>12}  speedup")
+    for count in counts:
+        workdir = tempfile.mkdtemp(prefix="salma-serialize-")
+        seed_database(workdir, count)
+        slow, slow_body = measure(workdir, {"FAST_JSON_RESPONSES": "0"}, repeat)
+        fast, fast_body = measure(workdir, {"FAST_JSON_RESPONSES": "1"}, repeat)
+        assert slow_body == fast_body, "body berbeda antara kedua mode"
+        print(f"{count:>8}  {slow * 1e3:9.1f} ms  {fast * 1e3:9.1f} ms  {slow / fast:6.1f}x")
@@ -0,0 +1,85 @@
+# file: benchmarks/bench_model_format.py
+# Bandingkan format model pickle vs mmap (array .npy + manifest):
+# waktu cold-start load model dan memori per worker (RSS dan PSS) saat
+# beberapa worker berjalan bersamaan di host yang sama.
+# Jalankan dari root project (setelah python app/train_model.py --export):
+#   python -m benchmarks.bench_model_format [jumlah_worker]
+import json
+import os
+import subprocess
+import sys
+import time
+
+def memory_kb():
+    """RSS dan PSS proses ini dalam kB. PSS membagi page bersama dengan jumlah proses pemakainya."""
+    result = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            if key in ("Rss", "Pss"):
+                result[key.lower()] = int(value.split()[0])
+    return result
+
+def run_worker(model_format, n_workers):
+    """Dijalankan di subprocess: load model, prediksi dataset, lalu laporkan waktu dan memori"""
+    import numpy as np
+    import pandas as pd
+
+    os.environ["MODEL_FORMAT"] = model_format
+    before = memory_kb()
+    start = time.perf_counter()
+    from app import ml_model
+    load_seconds = time.perf_counter() - start
+
+    X = pd.read_csv("app/tpq_dataset.csv")[ml_model.FEATURE_NAMES].to_numpy(np.float32)
+    ml_model.predict_performance_batch(X)
+
+    # Tunggu semua worker selesai load agar PSS menghitung page yang dipakai bersama
+    barrier = f"/tmp/bench_model_format_{model_format}"
+    open(f"{barrier}_{os.getpid()}", "w").close()
+    while len([f for f in os.listdir("/tmp") if f.startswith(os.path.basename(barrier) + "_")]) < n_workers:
+        time.sleep(0.05)
+    time.sleep(0.2)
+
+    after = memory_kb()
+    print(json.dumps({
+        "load_ms": load_seconds * 1e3,
+        "model_rss_kb": after["rss"] - before["rss"],
+        "rss_kb": after["rss"],
+        "pss_kb": after["pss"],
+    }))
+
+def run_format(model_format, n_workers):
+    barrier_prefix = f"bench_model_format_{model_format}_"
+    for f in os.listdir("/tmp"):
+        if f.startswith(barrier_prefix):
+            os.remove(os.path.join("/tmp", f))
+
+    env = {**os.environ, "MODEL_FORMAT": model_format}
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_model_format", "--worker", model_format, str(n_workers)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env,
+        )
+        for _ in range(n_workers)
+    ]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    def avg(key):
+        return sum(r[key] for r in results) / len(results)
+
+    print(
+        f"{model_format:<7} load {avg('load_ms'):8.1f} ms   model RSS {avg('model_rss_kb'):8.0f} kB"
+        f"   RSS {avg('rss_kb'):8.0f} kB   PSS {avg('pss_kb'):8.0f} kB   ({n_workers} worker)"
+    )
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2], int(sys.argv[3]))
+    else:
+        n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+        for model_format in ["pickle", "mmap"]:
+            run_format(model_format, n_workers)
@@ -0,0 +1,35 @@
+# file: benchmarks/bench_predict_explain.py
+# Latency prediksi dengan probabilitas saja vs dengan penjelasan (kontribusi
+# fitur dari jalur pohon, explain=true), untuk satu siswa dan batch.
+# Juga memastikan baseline + jumlah kontribusi == probabilitas model.
+# Jalankan dari root project: python -m benchmarks.bench_predict_explain
+import time
+import numpy as np
+
+from app import ml_model
+
+def measure(fn, repeat):
+    fn()  # warm-up (termasuk membangun tabel kontribusi per cabang)
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e3
+    return np.median(latencies), np.percentile(latencies, 99)
+
+if __name__ == "__main__":
+    loaded = ml_model.current_model()
+    rng = np.random.default_rng(0)
+    X = rng.integers(40, 101, size=(1000, len(ml_model.FEATURE_NAMES))).astype(np.float32)
+
+    proba, bias, contributions = loaded.compiled.explain(X)
+    reference = (loaded.model or loaded.compiled).predict_proba(X)
+    assert np.allclose(proba, reference), "Probabilitas explain berbeda dengan model"
+    assert np.allclose(bias + contributions.sum(axis=1), proba), "Kontribusi tidak menjumlah ke probabilitas"
+
+    for n_rows, repeat in [(1, 500), (100, 100), (1000, 20)]:
+        rows = X[:n_rows]
+        for label, top_k in [("probabilitas", 0), ("explain top-3", 3)]:
+            median, p99 = measure(lambda: ml_model.predict_details(rows, loaded, top_k), repeat)
+            print(f"{n_rows:>5} baris  {label:<14} median {median:8.3f} ms   p99 {p99:8.3f} ms")
@@ -0,0 +1,51 @@
+# file: benchmarks/bench_predict_row.py
+# Micro-benchmark latency prediksi satu siswa: jalur lama (pandas DataFrame)
+# vs jalur cepat predict_row (NumPy tanpa pandas).
+# Jalankan dari root project: python -m benchmarks.bench_predict_row
+import pickle
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+from app import ml_model
+
+SCORES = [83, 77, 69, 75, 82, 74, 72, 85, 76, 82, 84, 82]
+
+def load_original_model():
+    """Model asli (masih dengan feature_names_in_) untuk jalur pandas"""
+    with open("app/student_model.pkl", "rb") as f:
+        return pickle.load(f)
+
+def pandas_path(model, scores):
+    """Replika predict_performance lama"""
+    input_data = pd.DataFrame([dict(zip(ml_model.FEATURE_NAMES, scores))])
+    input_data = input_data[ml_model.FEATURE_NAMES]
+    return model.predict(input_data)[0]
+
+def numpy_path(scores):
+    row = np.array(scores, dtype=np.float32)
+    return ml_model.predict_row(row)
+
+def measure(fn, repeat):
+    fn()  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e6
+    return np.median(latencies), np.percentile(latencies, 99)
+
+if __name__ == "__main__":
+    warnings.simplefilter("error")  # Pastikan jalur cepat tidak memicu warning sklearn
+    original_model = load_original_model()
+    assert pandas_path(original_model, SCORES) == numpy_path(SCORES)
+
+    repeat = 500
+    for label, fn in [
+        ("pandas DataFrame", lambda: pandas_path(original_model, SCORES)),
+        ("numpy predict_row", lambda: numpy_path(SCORES)),
+    ]:
+        median, p99 = measure(fn, repeat)
+        print(f"{label:<20} median {median:8.1f} us   p99 {p99:8.1f} us")
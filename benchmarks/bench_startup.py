@@ -0,0 +1,74 @@
+# file: benchmarks/bench_startup.py
+# Budget waktu startup app.main:
+# 1. `python -X importtime -c "import app.main"` di proses baru (median dari beberapa kali):
+#    total waktu import, modul paling berat, dan modul yang tidak boleh ikut ter-import
+#    (sklearn/pandas/scipy harus menunggu warm-up di lifespan, lihat app/startup.py).
+# 2. Server uvicorn: waktu sampai melayani request (GET /docs) dan sampai GET /ready 200.
+# Exit code 1 jika import melewati budget atau modul terlarang ter-import (untuk CI).
+# Jalankan dari root project: python -m benchmarks.bench_startup [budget_ms] [ulangan]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.loadgen import ROOT_DIR, run_server
+
+DEFAULT_BUDGET_MS = 1500
+FORBIDDEN_MODULES = ("sklearn", "pandas", "scipy")
+
+def import_profile():
+    """Satu kali import app.main; mengembalikan {modul: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=tempfile.mkdtemp(prefix="salma-startup-"),
+        env={**os.environ, "PYTHONPATH": ROOT_DIR},
+        capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+def time_to_ready():
+    started = time.perf_counter()
+    with run_server() as server:
+        serving = time.perf_counter() - started
+        deadline = time.time() + 120
+        while httpx.get(server.base_url + "/ready").status_code != 200:
+            if time.time() > deadline:
+                raise RuntimeError("/ready tidak pernah 200")
+            time.sleep(0.05)
+        ready = time.perf_counter() - started
+    return serving, ready
+
+if __name__ == "__main__":
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    profiles = [import_profile() for _ in range(repeat)]
+    import_ms = statistics.median(profile["app.main"][1] for profile in profiles) / 1e3
+    last = profiles[-1]
+    print(f"import app.main: {import_ms:.0f} ms (median {repeat}x, budget {budget_ms:.0f} ms)")
+    print("modul paling berat (kumulatif):")
+    top_level = {name: times for name, times in last.items() if "." not in name and name != "app"}
+    for name, (_, cumulative_us) in sorted(top_level.items(), key=lambda item: -item[1][1])[:8]:
+        print(f"  {name:<24} {cumulative_us / 1e3:8.1f} ms")
+
+    forbidden = sorted({name.split(".")[0] for name in last if name.split(".")[0] in FORBIDDEN_MODULES})
+    if forbidden:
+        print(f"modul berat ter-import saat import app.main: {', '.join(forbidden)}")
+
+    serving, ready = time_to_ready()
+    print(f"uvicorn: melayani request {serving:.2f} s, /ready 200 {ready:.2f} s setelah start")
+
+    if import_ms > budget_ms or forbidden:
+        print("GAGAL: startup melewati budget")
+        sys.exit(1)
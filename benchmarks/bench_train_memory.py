@@ -0,0 +1,79 @@
+# file: benchmarks/bench_train_memory.py
+# Bandingkan training biasa (pd.read_csv seluruh file + train_test_split) dengan
+# mode streaming (chunk uint8 + shard sesuai memory budget): waktu dan peak RSS.
+# Dataset sintetis dibuat di direktori sementara, model ditulis ke sana juga.
+# Jalankan dari root project:
+#   python -m benchmarks.bench_train_memory [jumlah_baris] [budget_mb]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+try:
+    import resource
+except ImportError:  # Windows: peak RSS tidak diukur
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "app"))
+
+from train_model import FEATURE_COLUMNS, TARGET_COLUMN  # noqa: E402
+
+def generate_csv(path, n_rows, chunk_rows=200_000, seed=0):
+    """Dataset dengan layout tpq_dataset.csv, ditulis per chunk"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows):
+        n = min(chunk_rows, n_rows - start)
+        base = rng.integers(40, 100, size=(n, 1))
+        scores = np.clip(base + rng.integers(-8, 9, size=(n, len(FEATURE_COLUMNS))), 0, 100)
+        mean = scores.mean(axis=1)
+        kategori = np.select([mean >= 85, mean >= 70, mean >= 60], ["BSB", "BSH", "MB"], default="BB")
+        df = pd.DataFrame(scores, columns=FEATURE_COLUMNS)
+        df.insert(0, "ID", np.arange(start + 1, start + n + 1))
+        df.insert(1, "Nama", [f"Siswa_{i}" for i in range(start + 1, start + n + 1)])
+        df.insert(2, "Kelas", "I.1")
+        df["Rata_Rata"] = mean.round(2)
+        df[TARGET_COLUMN] = kategori
+        df.to_csv(path, mode="a" if start else "w", header=not start, index=False)
+
+def run_worker(mode, csv_path, budget_mb):
+    """Dijalankan di subprocess (cwd = direktori sementara) agar peak RSS terpisah per mode"""
+    os.makedirs("app", exist_ok=True)
+    start = time.perf_counter()
+    if mode == "full":
+        from train_model import train_model_with_csv
+        train_model_with_csv(csv_path)
+    else:
+        from train_streaming import train_model_streaming
+        train_model_streaming(csv_path, memory_budget_mb=budget_mb)
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None,
+    }))
+
+def run_mode(mode, csv_path, budget_mb, workdir):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_train_memory", "--worker", mode, csv_path, str(budget_mb)],
+        cwd=workdir, env={**os.environ, "PYTHONPATH": ROOT_DIR}, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    rss = result["peak_rss_mb"]
+    rss_text = f"{rss:8.0f} MB" if rss is not None else "     n/a"
+    print(f"{mode:<10} {result['seconds']:8.1f} s   peak RSS {rss_text}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+        budget_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+        workdir = tempfile.mkdtemp(prefix="salma-train-")
+        csv_path = os.path.join(workdir, "history.csv")
+        generate_csv(csv_path, n_rows)
+        print(f"{n_rows} baris, {os.path.getsize(csv_path) / 1e6:.0f} MB CSV, budget streaming {budget_mb} MB")
+        for mode in ["full", "streaming"]:
+            run_mode(mode, csv_path, budget_mb, workdir)
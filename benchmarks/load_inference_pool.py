@@ -0,0 +1,108 @@
+# file: benchmarks/load_inference_pool.py
+# Load test POST /predict (cache prediksi nonaktif, setiap request nilai berbeda):
+# predict di threadpool (INFERENCE_WORKERS=0) vs inference pool tanpa batching
+# (INFERENCE_BATCH_WAIT_MS=0) vs pool dengan micro-batching (default), pada concurrency naik.
+# Baris "campuran" mengukur GET /students/{id} (route DB) saat /predict dibebani
+# concurrency tertinggi, untuk melihat persaingan threadpool/GIL.
+# Bagian kedua memanggil InferencePool.predict langsung (tanpa HTTP) agar biaya
+# IPC per request vs per batch terlihat tanpa tertutup overhead server.
+# Jalankan dari root project: python -m benchmarks.load_inference_pool [concurrency,...] [detik]
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.loadgen import (
+    SUBJECT_FIELDS, admin_token, format_stats, run_load_async, run_server, seed_students, student_payload,
+)
+
+SCENARIOS = [
+    ("threadpool", {"INFERENCE_WORKERS": "0"}),
+    ("pool 1 worker, tanpa batch", {"INFERENCE_WORKERS": "1", "INFERENCE_BATCH_WAIT_MS": "0"}),
+    ("pool 1 worker, batch", {"INFERENCE_WORKERS": "1"}),
+    ("pool 2 worker, batch", {"INFERENCE_WORKERS": "2"}),
+]
+
+def wait_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while httpx.get(base_url + "/ready").status_code != 200:
+        if time.time() > deadline:
+            raise RuntimeError("Server tidak pernah ready")
+        time.sleep(0.1)
+
+async def predict(client, i):
+    payload = student_payload(i)
+    return await client.post("/predict", json={field: payload[field] for field in SUBJECT_FIELDS})
+
+async def mixed(base_url, headers, student_ids, concurrency, duration):
+    async def get_student(client, i):
+        return await client.get(f"/students/{student_ids[i % len(student_ids)]}")
+
+    _, students = await asyncio.gather(
+        run_load_async(base_url, predict, concurrency, duration, headers=headers),
+        run_load_async(base_url, get_student, 4, duration, headers=headers),
+    )
+    return students
+
+async def direct(pool, loaded, concurrency, duration):
+    """Setiap coroutine memanggil pool.predict untuk satu baris terus-menerus"""
+    rng = np.random.default_rng(0)
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            X = rng.integers(40, 101, size=(1, len(SUBJECT_FIELDS))).astype(np.float32)
+            start = time.perf_counter()
+            await pool.predict(X, loaded)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": 0,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1e3,
+    }
+
+def run_direct(levels, duration):
+    from app import ml_model
+    from app.inference_pool import INFERENCE_BATCH_MAX_SIZE, INFERENCE_QUEUE_SIZE, InferencePool
+
+    loaded = ml_model.current_model()
+    for label, wait_ms in [("langsung, tanpa batch", 0), ("langsung, batch", 2)]:
+        pool = InferencePool(1, INFERENCE_BATCH_MAX_SIZE, wait_ms, INFERENCE_QUEUE_SIZE, 30)
+        pool.start()
+        for concurrency in levels:
+            stats = asyncio.run(direct(pool, loaded, concurrency, duration))
+            print(format_stats(f"{label}, c={concurrency}", stats))
+        print(f"{'':<28} batch rata-rata {pool.stats()['avg_batch_rows']} baris")
+        pool.shutdown()
+
+if __name__ == "__main__":
+    levels = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1, 8, 32, 128]
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    env_common = {"PREDICT_CACHE_SIZE": "0", "PREDICTION_LOG_ENABLED": "0", "STARTUP_WARMUP": "blocking"}
+    for label, env in SCENARIOS:
+        with run_server({**env_common, **env}) as server:
+            wait_ready(server.base_url)
+            token = admin_token(server.base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            student_ids = seed_students(server.base_url, token, 50)
+            for concurrency in levels:
+                stats = asyncio.run(run_load_async(server.base_url, predict, concurrency, duration, headers=headers))
+                print(format_stats(f"{label}, c={concurrency}", stats))
+            stats = asyncio.run(mixed(server.base_url, headers, student_ids, max(levels), duration))
+            print(format_stats(f"{label}, campuran GET", stats))
+            pool = httpx.get(server.base_url + "/predict/pool", headers=headers).json()
+            print(f"{'':<28} batch rata-rata {pool['avg_batch_rows']} baris, ditolak {pool['rejected']}, "
+                  f"timeout {pool['timeouts']}")
+
+    run_direct(levels, duration)
@@ -0,0 +1,47 @@
+# file: benchmarks/load_listing_cache.py
+# Load test GET /kegiatan: LISTING_CACHE_SIZE=0 (query + serialisasi setiap
+# request) vs cache aktif, masing-masing tanpa dan dengan If-None-Match
+# (client polling yang menyimpan ETag terakhir dan menerima 304).
+# Jalankan dari root project: python -m benchmarks.load_listing_cache [jumlah_kegiatan] [concurrency] [detik]
+import sys
+
+import httpx
+
+from benchmarks.loadgen import admin_token, format_stats, run_load, run_server
+
+def kegiatan_payload(i):
+    return {
+        "nama_kegiatan": f"Kegiatan {i}",
+        "deskripsi": "Kegiatan rutin santri " * 5,
+        "tanggal": "2026-01-01",
+        "kelas": f"I.{i % 5 + 1}",
+        "waktu_mulai": "08:00",
+        "waktu_selesai": "10:00",
+        "lokasi": "Aula TPQ",
+        "fotoKegiatan": f"/uploads/kegiatan/{i}.jpg",
+    }
+
+if __name__ == "__main__":
+    n_kegiatan = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    for label, env in [("tanpa cache", {"LISTING_CACHE_SIZE": "0"}), ("cache", {})]:
+        with run_server(env) as server:
+            base_url = server.base_url
+            token = admin_token(base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            with httpx.Client(base_url=base_url, headers=headers) as client:
+                for i in range(n_kegiatan):
+                    client.post("/kegiatan", json=kegiatan_payload(i))
+                etag = client.get("/kegiatan").headers["etag"]
+
+            async def full(client, i):
+                return await client.get("/kegiatan")
+
+            async def conditional(client, i):
+                return await client.get("/kegiatan", headers={"If-None-Match": etag})
+
+            for suffix, make_request in [("200 penuh", full), ("If-None-Match 304", conditional)]:
+                stats = run_load(base_url, make_request, concurrency, duration, headers=headers)
+                print(format_stats(f"{label}, {suffix}", stats))
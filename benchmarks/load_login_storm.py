@@ -0,0 +1,60 @@
+# file: benchmarks/load_login_storm.py
+# Load test lonjakan login: GET /students/{id} diukur sendirian, lalu bersamaan
+# dengan banyak client yang terus POST /login. Dibandingkan bcrypt di threadpool
+# (PASSWORD_HASH_WORKERS=0, antrian besar) vs process pool terbatas.
+# Jalankan dari root project: python -m benchmarks.load_login_storm [login_clients] [detik]
+import asyncio
+import collections
+import sys
+
+from benchmarks.loadgen import admin_token, format_stats, run_load_async, run_server, seed_students
+
+N_STUDENTS = 50
+READ_CONCURRENCY = 8
+
+SCENARIOS = [
+    ("threadpool", {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_QUEUE_SIZE": "10000"}),
+    ("process pool", {"PASSWORD_HASH_WORKERS": "1", "PASSWORD_HASH_QUEUE_SIZE": "4", "PASSWORD_HASH_NICE": "0"}),
+    ("process pool + nice", {"PASSWORD_HASH_WORKERS": "1", "PASSWORD_HASH_QUEUE_SIZE": "4"}),
+]
+
+def reader(student_ids):
+    async def read_student(client, i):
+        return await client.get(f"/students/{student_ids[i % len(student_ids)]}")
+    return read_student
+
+async def storm(base_url, headers, student_ids, login_clients, duration):
+    login_statuses = collections.Counter()
+
+    async def login(client, i):
+        response = await client.post("/login", data={"username": "admin", "password": "admin123"})
+        login_statuses[response.status_code] += 1
+        # Client yang sopan menunggu sesuai Retry-After sebelum mencoba lagi
+        if "retry-after" in response.headers:
+            await asyncio.sleep(float(response.headers["retry-after"]))
+        return response
+
+    reads, logins = await asyncio.gather(
+        run_load_async(base_url, reader(student_ids), READ_CONCURRENCY, duration, headers=headers),
+        run_load_async(base_url, login, login_clients, duration),
+    )
+    return reads, logins, login_statuses
+
+if __name__ == "__main__":
+    login_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+
+    for label, env in SCENARIOS:
+        with run_server(env) as server:
+            base_url = server.base_url
+            token = admin_token(base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            student_ids = seed_students(base_url, token, N_STUDENTS)
+
+            idle = asyncio.run(run_load_async(base_url, reader(student_ids), READ_CONCURRENCY, duration, headers=headers))
+            reads, logins, statuses = asyncio.run(storm(base_url, headers, student_ids, login_clients, duration))
+
+            print(format_stats(f"{label}: reads idle", idle))
+            print(format_stats(f"{label}: reads + storm", reads))
+            print(f"{label}: login status {dict(sorted(statuses.items()))}, "
+                  f"{logins['rps']:.1f} req/s, p99 {logins['p99_ms']:.1f} ms")
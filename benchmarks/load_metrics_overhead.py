@@ -0,0 +1,76 @@
+# file: benchmarks/load_metrics_overhead.py
+# Overhead instrumentasi: server yang sama dengan METRICS_ENABLED=0 vs 1 untuk
+# GET /students/{id} (ada query DB) dan POST /predict (inferensi model),
+# lalu satu scrape /metrics untuk melihat waktunya. Karena load test sangat
+# dipengaruhi noise, overhead middleware juga diukur langsung per request
+# terhadap app ASGI kosong.
+# Jalankan dari root project: python -m benchmarks.load_metrics_overhead [concurrency] [detik]
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app import metrics
+
+from benchmarks.loadgen import (SUBJECT_FIELDS, admin_token, format_stats, run_load, run_server,
+                                seed_students, student_payload)
+
+N_STUDENTS = 100
+
+def get_student(student_ids):
+    async def make_request(client, i):
+        return await client.get(f"/students/{student_ids[i % len(student_ids)]}")
+    return make_request
+
+async def predict(client, i):
+    payload = student_payload(i)
+    return await client.post("/predict", json={field: payload[field] for field in SUBJECT_FIELDS})
+
+def middleware_overhead_us(n=50_000):
+    """Waktu tambahan per request dari MetricsMiddleware (mikrodetik)"""
+    class Route:
+        path = "/students/{id}"
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    async def per_request(app):
+        start = time.perf_counter()
+        for _ in range(n):
+            await app({"type": "http", "method": "GET"}, receive, send)
+        return (time.perf_counter() - start) / n * 1e6
+
+    async def main():
+        await per_request(metrics.MetricsMiddleware(endpoint))  # warm-up
+        return await per_request(metrics.MetricsMiddleware(endpoint)) - await per_request(endpoint)
+
+    return asyncio.run(main())
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    print(f"MetricsMiddleware: +{middleware_overhead_us():.1f} us per request")
+
+    for enabled in ["0", "1"]:
+        # Log prediksi dimatikan agar yang dibandingkan hanya metrics
+        with run_server({"METRICS_ENABLED": enabled, "PREDICTION_LOG_ENABLED": "0"}) as server:
+            base_url = server.base_url
+            token = admin_token(base_url)
+            headers = {"Authorization": f"Bearer {token}"}
+            student_ids = seed_students(base_url, token, N_STUDENTS)
+            for label, make_request in [("GET /students/{id}", get_student(student_ids)), ("POST /predict", predict)]:
+                stats = run_load(base_url, make_request, concurrency, duration, headers=headers)
+                print(format_stats(f"{label} metrics={enabled}", stats))
+            if enabled == "1":
+                start = time.perf_counter()
+                body = httpx.get(base_url + "/metrics").text
+                print(f"scrape /metrics: {(time.perf_counter() - start) * 1e3:.1f} ms, {len(body.splitlines())} baris")
@@ -0,0 +1,76 @@
+# file: benchmarks/load_prediction_log.py
+# Load test log prediksi: POST /predict tanpa log, dengan insert + commit
+# sinkron di dalam request (desain yang dihindari), dan dengan background
+# writer batch (default). Setelah selesai writer di-shutdown dan jumlah baris
+# di prediction_logs dicocokkan dengan jumlah request yang dicatat.
+# Jalankan dari root project: python -m benchmarks.load_prediction_log [concurrency] [detik]
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from benchmarks.loadgen import ROOT_DIR, SUBJECT_FIELDS, format_stats, run_load_async, student_payload
+
+async def main(concurrency, duration):
+    # Database sementara; app di-import setelah pindah direktori kerja
+    sys.path.insert(0, ROOT_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="salma-bench-"))
+    from app import database, models
+    from app.main import app
+    from app.prediction_log import writer
+    from app.startup import prepare_database, warm_up
+
+    # ASGITransport tidak menjalankan lifespan
+    await prepare_database()
+    warm_up()
+
+    transport = httpx.ASGITransport(app=app)
+    base_url = "http://bench"
+    async with httpx.AsyncClient(base_url=base_url, transport=transport) as client:
+        credentials = {"username": "admin", "password": "admin123"}
+        await client.post("/register", json={**credentials, "role": "admin"})
+        token = (await client.post("/login", data=credentials)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def predict(client, i):
+        payload = student_payload(i)
+        return await client.post("/predict", json={field: payload[field] for field in SUBJECT_FIELDS})
+
+    def sync_record(**fields):
+        # Engine sync di event loop: request menunggu insert + commit selesai
+        with database.get_engine().begin() as connection:
+            connection.execute(insert(models.PredictionLog), [fields])
+
+    scenarios = [
+        ("log nonaktif", False, None),
+        ("insert sinkron per request", True, sync_record),
+        ("background writer batch", True, None),
+    ]
+    logged = 0
+    for label, enabled, record in scenarios:
+        writer.enabled = enabled
+        if record is not None:
+            writer.record = record
+        else:
+            writer.__dict__.pop("record", None)
+        stats = await run_load_async(base_url, predict, concurrency, duration, headers=headers, transport=transport)
+        if enabled:
+            logged += stats["requests"] - stats["errors"]
+        print(format_stats(label, stats))
+
+    await writer.shutdown()
+    with database.SessionLocal() as db:
+        rows = db.scalar(select(func.count()).select_from(models.PredictionLog))
+    print(f"prediction_logs: {rows} baris untuk {logged} request dicatat, writer {writer.stats()}")
+
+    # Koneksi aiosqlite memakai thread non-daemon, tutup agar proses bisa selesai
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    asyncio.run(main(concurrency, duration))
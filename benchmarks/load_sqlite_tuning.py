@@ -0,0 +1,34 @@
+# file: benchmarks/load_sqlite_tuning.py
+# Concurrency benchmark SQLite: trafik campuran baca/tulis (POST + PUT + GET)
+# tanpa tuning (SQLITE_TUNING=0) vs WAL + pragma + antrian penulis tunggal.
+# Jalankan dari root project: python -m benchmarks.load_sqlite_tuning [concurrency] [detik]
+import sys
+
+from benchmarks.loadgen import admin_token, format_stats, run_load, run_server, seed_students, student_payload
+
+N_STUDENTS = 100
+
+def scenario(student_ids):
+    async def make_request(client, i):
+        student_id = student_ids[i % len(student_ids)]
+        if i % 4 == 0:
+            return await client.post("/students", json=student_payload(i))
+        if i % 4 == 1:
+            return await client.put(f"/students/{student_id}", json={
+                k: v for k, v in student_payload(i).items() if k != "orang_tua_id"
+            })
+        return await client.get(f"/students/{student_id}")
+    return make_request
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+
+    for label, env in [("default journal", {"SQLITE_TUNING": "0"}), ("WAL + single writer", {"SQLITE_TUNING": "1"})]:
+        with run_server(env) as server:
+            base_url = server.base_url
+            token = admin_token(base_url)
+            student_ids = seed_students(base_url, token, N_STUDENTS)
+            stats = run_load(base_url, scenario(student_ids), concurrency, duration,
+                             headers={"Authorization": f"Bearer {token}"})
+            print(format_stats(label, stats))
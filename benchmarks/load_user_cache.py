@@ -0,0 +1,87 @@
+# file: benchmarks/load_user_cache.py
+# Load test cache user: jumlah query DB per request dengan USER_CACHE_SIZE=0
+# (query users di setiap request) vs cache aktif, plus /predict yang hanya
+# memakai klaim token. App dijalankan in-process agar query bisa dihitung
+# lewat event SQLAlchemy.
+# Jalankan dari root project: python -m benchmarks.load_user_cache [concurrency] [detik]
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+from sqlalchemy import event
+
+from benchmarks.loadgen import ROOT_DIR, SUBJECT_FIELDS, format_stats, run_load_async, student_payload
+
+N_STUDENTS = 50
+
+class QueryCounter:
+    def __init__(self, engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+async def main(concurrency, duration):
+    # Database sementara; app di-import setelah pindah direktori kerja
+    sys.path.insert(0, ROOT_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="salma-bench-"))
+    from app import database
+    from app.main import app
+    from app.principal import user_cache
+    from app.startup import prepare_database, warm_up
+
+    # ASGITransport tidak menjalankan lifespan
+    await prepare_database()
+    warm_up()
+
+    if database.async_engine is not None:
+        engines = [database.async_engine.sync_engine]
+    else:
+        engines = [database.get_engine()]
+    counter = QueryCounter(engines)
+    transport = httpx.ASGITransport(app=app)
+    base_url = "http://bench"
+
+    async with httpx.AsyncClient(base_url=base_url, transport=transport) as client:
+        credentials = {"username": "admin", "password": "admin123"}
+        await client.post("/register", json={**credentials, "role": "admin"})
+        token = (await client.post("/login", data=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        student_ids = [
+            (await client.post("/students", json=student_payload(i), headers=headers)).json()["id"]
+            for i in range(N_STUDENTS)
+        ]
+
+    async def get_student(client, i):
+        return await client.get(f"/students/{student_ids[i % len(student_ids)]}")
+
+    async def predict(client, i):
+        payload = student_payload(i)
+        return await client.post("/predict", json={field: payload[field] for field in SUBJECT_FIELDS})
+
+    scenarios = [
+        ("GET /students/{id} no cache", get_student, 0),
+        ("GET /students/{id} cache", get_student, user_cache.max_size or 1024),
+        ("POST /predict (claims)", predict, user_cache.max_size or 1024),
+    ]
+    for label, make_request, cache_size in scenarios:
+        user_cache.max_size = cache_size
+        user_cache.clear()
+        before = counter.count
+        stats = await run_load_async(base_url, make_request, concurrency, duration,
+                                     headers=headers, transport=transport)
+        queries = (counter.count - before) / max(stats["requests"], 1)
+        print(format_stats(label, stats) + f"   queries/req {queries:.2f}")
+
+    # Koneksi aiosqlite memakai thread non-daemon, tutup agar proses bisa selesai
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    asyncio.run(main(concurrency, duration))
@@ -0,0 +1,75 @@
+# file: benchmarks/load_workers.py
+# Scaling gunicorn + worker uvicorn (gunicorn.conf.py) untuk 1/2/4/8 worker:
+# - POST /predict tanpa cache prediksi (inferensi forest, CPU-bound)
+# - POST /login dengan bcrypt di threadpool worker (PASSWORD_HASH_WORKERS=0)
+# - total PSS master + worker; dengan preload halaman model dibagi antar worker,
+#   baris terakhir mengulang jumlah worker terbesar dengan WEB_PRELOAD=0 sebagai pembanding.
+# Hasil dibatasi jumlah CPU mesin (os.cpu_count() dicetak di awal).
+# Jalankan dari root project: python -m benchmarks.load_workers [worker,...] [concurrency] [detik]
+import os
+import sys
+import time
+
+from benchmarks.loadgen import ROOT_DIR, SUBJECT_FIELDS, admin_token, format_stats, run_load, run_server, student_payload
+
+GUNICORN = [sys.executable, "-m", "gunicorn", "app.main:app", "-c", os.path.join(ROOT_DIR, "gunicorn.conf.py")]
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+def pss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except ProcessLookupError:
+        pass  # worker yang di-restart gunicorn di antara listing dan pembacaan
+    return 0.0
+
+def wait_for_workers(pid, workers, timeout=60):
+    deadline = time.time() + timeout
+    while len(child_pids(pid)) < workers and time.time() < deadline:
+        time.sleep(0.2)
+    time.sleep(1)  # beri waktu startup event di worker terakhir
+
+def measure(workers, concurrency, duration, preload=True):
+    env = {
+        "WEB_CONCURRENCY": str(workers),
+        "WEB_PRELOAD": "1" if preload else "0",
+        "PREDICT_CACHE_SIZE": "0",
+        "PREDICTION_LOG_ENABLED": "0",
+        "PASSWORD_HASH_WORKERS": "0",
+        "PASSWORD_HASH_TIMEOUT_SECONDS": "120",
+    }
+    label = f"{workers} worker" + ("" if preload else " tanpa preload")
+    with run_server(env, command=GUNICORN) as server:
+        wait_for_workers(server.pid, workers)
+        pids = [server.pid, *child_pids(server.pid)]
+        memory = sum(pss_mb(pid) for pid in pids)
+        token = admin_token(server.base_url)
+
+        async def predict(client, i):
+            payload = student_payload(i)
+            return await client.post("/predict", json={field: payload[field] for field in SUBJECT_FIELDS})
+
+        async def login(client, i):
+            return await client.post("/login", data={"username": "admin", "password": "admin123"})
+
+        headers = {"Authorization": f"Bearer {token}"}
+        # bcrypt jauh lebih lambat dari inferensi, concurrency login dibatasi agar antrian tidak timeout
+        for name, make_request, clients in [("predict", predict, concurrency), ("login", login, min(concurrency, 8))]:
+            stats = run_load(server.base_url, make_request, clients, duration, headers=headers)
+            print(format_stats(f"{label}, {name}", stats))
+        print(f"{label}, PSS total {memory:7.1f} MB ({len(pids)} proses)")
+
+if __name__ == "__main__":
+    counts = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1, 2, 4, 8]
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+
+    print(f"CPU: {os.cpu_count()}")
+    for workers in counts:
+        measure(workers, concurrency, duration)
+    measure(max(counts), concurrency, duration, preload=False)
@@ -0,0 +1,136 @@
+# file: benchmarks/loadgen.py
+# Helper bersama untuk load test: menjalankan server uvicorn di subprocess
+# dengan database sementara dan mengirim request konkuren dengan httpx.
+# Butuh httpx (pip install httpx).
+import asyncio
+import collections
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SUBJECT_FIELDS = [
+    "al_quran_iqro", "hafalan_surat_pendek", "hafalan_doa", "hafalan_ayat_pilihan",
+    "bahasa_arab", "bahasa_inggris", "khat_menulis", "menggambar_mewarnai",
+    "jasmani_kesehatan", "kreativitas_keaktifan", "ulumul_quran", "kemampuan_berbahasa",
+]
+
+Server = collections.namedtuple("Server", ["base_url", "pid", "workdir"])
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextlib.contextmanager
+def run_server(env=None, args=None, workdir=None, command=None):
+    """
+    Jalankan app.main:app dengan uvicorn di direktori kerja sementara
+    (sql_app.db baru setiap kali, kecuali workdir diberikan). Menghasilkan Server.
+    command menggantikan perintah uvicorn (misalnya gunicorn); port diberikan lewat env PORT.
+    """
+    port = free_port()
+    workdir = workdir or tempfile.mkdtemp(prefix="salma-bench-")
+    server_env = {**os.environ, "PYTHONPATH": ROOT_DIR, **(env or {}), "PORT": str(port)}
+    command = command or [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        *(args or []),
+    ]
+    proc = subprocess.Popen(command, cwd=workdir, env=server_env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                httpx.get(base_url + "/docs", timeout=1)
+                break
+            except httpx.TransportError:
+                if proc.poll() is not None or time.time() > deadline:
+                    raise RuntimeError("Server gagal start")
+                time.sleep(0.2)
+        yield Server(base_url, proc.pid, workdir)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+def admin_token(base_url, username="admin", password="admin123", role="admin"):
+    httpx.post(base_url + "/register", json={"username": username, "password": password, "role": role})
+    response = httpx.post(base_url + "/login", data={"username": username, "password": password})
+    return response.json()["access_token"]
+
+def student_payload(i, orang_tua_id=1):
+    payload = {
+        "name": f"Siswa {i}",
+        "kelas": f"I.{i % 5 + 1}",
+        "tanggal_lahir": "2018-01-01",
+        "jenis_kelamin": "Laki-laki" if i % 2 else "Perempuan",
+        "no_hp": "08123456789",
+        "nama_orang_tua": f"Orang Tua {i}",
+        "orang_tua_id": orang_tua_id,
+    }
+    payload.update({field: 50 + (i * 7 + n * 3) % 50 for n, field in enumerate(SUBJECT_FIELDS)})
+    return payload
+
+def seed_students(base_url, token, count):
+    headers = {"Authorization": f"Bearer {token}"}
+    with httpx.Client(base_url=base_url, headers=headers) as client:
+        return [client.post("/students", json=student_payload(i)).json()["id"] for i in range(count)]
+
+async def run_load_async(base_url, make_request, concurrency=16, duration=10.0, headers=None, transport=None):
+    """Versi coroutine dari run_load, untuk dipanggil dari event loop yang sudah berjalan"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits,
+                                 timeout=60, transport=transport) as client:
+        async def worker(worker_id):
+            nonlocal errors
+            i = worker_id
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await make_request(client, i)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+                i += concurrency
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+def run_load(base_url, make_request, concurrency=16, duration=10.0, headers=None, transport=None):
+    """
+    Kirim request terus-menerus dari `concurrency` client selama `duration` detik.
+    make_request(client, i) adalah coroutine yang mengembalikan httpx.Response.
+    transport=httpx.ASGITransport(app) menjalankan app di proses yang sama.
+    """
+    return asyncio.run(run_load_async(base_url, make_request, concurrency, duration, headers, transport))
+
+def format_stats(label, stats):
+    return (
+        f"{label:<28} {stats['rps']:8.1f} req/s   p50 {stats['p50_ms']:7.1f} ms"
+        f"   p99 {stats['p99_ms']:7.1f} ms   errors {stats['errors']}"
+    )
@@ -0,0 +1,42 @@
+# file: gunicorn.conf.py
+# Launcher production: gunicorn dengan worker uvicorn (lihat Procfile / railway.json)
+#   gunicorn app.main:app -c gunicorn.conf.py
+#
+# preload_app: app.main di-import dan warm-up (model ML, compiled forest, pandas)
+# dijalankan sekali di proses master, lalu worker di-fork sehingga memori itu dibagi
+# copy-on-write. Hal yang per proses (create_all/kelas_stats, model watcher, process
+# pool bcrypt, writer log prediksi, koneksi DB) dikerjakan lifespan di worker.
+import gc
+import os
+
+# POST /model/reload hanya memasang model di worker yang menerimanya; worker lain
+# mengikuti lewat model watcher (app/.active_model.json dan mtime file model), jadi
+# watcher selalu aktif di gunicorn. Di-set sebelum app di-import (preload).
+os.environ.setdefault("MODEL_WATCH_INTERVAL_SECONDS", "5")
+
+# Jumlah worker; default satu per CPU karena beban berat (bcrypt, inferensi) CPU-bound
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = os.getenv("WEB_PRELOAD", "1") == "1"
+timeout = int(os.getenv("WEB_TIMEOUT_SECONDS", "60"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT_SECONDS", "30"))
+keepalive = 5
+# Worker di-restart setelah N request (0 = tidak pernah), jitter agar tidak bersamaan
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = None
+
+def when_ready(server):
+    if preload_app:
+        # Worker mewarisi model yang sudah di-load; lifespan di worker hanya start inference pool
+        from app.startup import warm_up
+        warm_up(serving=False)
+        # Objek hasil preload dipindah ke generasi permanen GC: collector di worker tidak
+        # menyentuh (dan menyalin) halaman memori yang dibagi dengan master
+        gc.freeze()
+
+def post_fork(server, worker):
+    if preload_app:
+        from app.database import dispose_after_fork
+        dispose_after_fork()
@@ -0,0 +1,30 @@
+# file: tests/conftest.py
+# Test memakai database SQLite sementara; env harus di-set sebelum app di-import.
+# Jalankan dari root project: python -m pytest tests
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='salma-test-')}/test.db"
+os.environ["PREDICTION_LOG_ENABLED"] = "0"
+os.environ["STARTUP_WARMUP"] = "off"
+os.environ["LISTING_GENERATION_DIR"] = tempfile.mkdtemp(prefix="salma-test-listing-")
+
+import pytest
+from sqlalchemy import delete
+
+from app import models
+from app.database import Base, SessionLocal, get_engine
+
+@pytest.fixture
+def db():
+    """Session sync dengan tabel students dan kelas_stats kosong"""
+    Base.metadata.create_all(bind=get_engine())
+    session = SessionLocal()
+    session.execute(delete(models.Student))
+    session.execute(delete(models.KelasStats))
+    session.execute(delete(models.User))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,57 @@
+# file: tests/test_inference_pool.py
+# Pool yang rusak dibuat ulang, dan callback terlambat dari pool lama tidak
+# boleh mematikan pool pengganti.
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from app import ml_model
+from app.inference_pool import InferencePool
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="butuh SIGKILL")
+
+def kill_workers(executor):
+    for pid in list(executor._processes):
+        os.kill(pid, signal.SIGKILL)
+    # Tunggu sampai thread manajemen executor menandai pool rusak
+    deadline = time.time() + 10
+    while not executor._broken and time.time() < deadline:
+        time.sleep(0.05)
+    assert executor._broken
+
+def test_callback_pool_lama_tidak_mematikan_pool_baru():
+    loaded = ml_model.current_model()
+    X = np.full((1, len(ml_model.FEATURE_NAMES)), 80, dtype=np.float32)
+    pool = InferencePool(1, 64, 0, 100, 30)
+    pool.start()
+
+    async def scenario():
+        expected, _ = await pool.predict(X, loaded)
+        broken = pool._executor
+        kill_workers(broken)
+
+        # Submit ke pool rusak: dibuat ulang sekali, request tetap berhasil
+        details, _ = await pool.predict(X, loaded)
+        replacement = pool._executor
+        assert replacement is not None and replacement is not broken
+        assert details == expected
+
+        # Batch lain dari pool lama baru selesai (gagal) setelah pool pengganti ada
+        failed = asyncio.get_running_loop().create_future()
+        failed.set_exception(BrokenProcessPool())
+        pool._deliver(failed, [], time.perf_counter(), broken)
+
+        assert pool._executor is replacement
+        details, _ = await pool.predict(X, loaded)
+        assert details == expected
+        assert pool.in_flight == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,132 @@
+# file: tests/test_kelas_stats.py
+# kelas_stats harus selalu sama dengan agregat penuh dari tabel students
+# (kelas_stats.check kosong) setelah setiap jenis perubahan data siswa.
+import asyncio
+
+import httpx
+
+from app import auth, kelas_stats, models
+from app.database import SessionLocal, async_engine
+from app.student_import import save_chunk
+
+SUBJECT_FIELDS = kelas_stats.SUBJECT_FIELDS
+
+def kategori_for(rata_rata):
+    if rata_rata >= 85:
+        return "BSB"
+    if rata_rata >= 70:
+        return "BSH"
+    if rata_rata >= 60:
+        return "MB"
+    return "BB"
+
+def student_values(name, kelas, nilai):
+    return {
+        "name": name,
+        "kelas": kelas,
+        "tanggal_lahir": "2018-01-01",
+        "jenis_kelamin": "Perempuan",
+        "no_hp": "08123456789",
+        "nama_orang_tua": "Orang Tua",
+        **{field: nilai for field in SUBJECT_FIELDS},
+        "rata_rata": float(nilai),
+        "kategori": kategori_for(nilai),
+    }
+
+def add_students(db, rows, orang_tua_id=None):
+    students = [models.Student(**student_values(*row), orang_tua_id=orang_tua_id) for row in rows]
+    db.add_all(students)
+    db.commit()
+    return students
+
+def set_nilai(student, nilai):
+    for field in SUBJECT_FIELDS:
+        setattr(student, field, nilai)
+    student.rata_rata = float(nilai)
+    student.kategori = kategori_for(nilai)
+
+def jumlah_siswa(db, kelas):
+    stats = db.get(models.KelasStats, kelas)
+    db.expire_all()
+    return stats.jumlah_siswa if stats else 0
+
+def test_insert(db):
+    add_students(db, [("A", "K1", 90), ("B", "K1", 65), ("C", "K2", 50)])
+    assert kelas_stats.check(db) == []
+    assert jumlah_siswa(db, "K1") == 2
+    assert db.get(models.KelasStats, "K1").jumlah_bsb == 1
+
+def test_update_nilai(db):
+    a, _ = add_students(db, [("A", "K1", 90), ("B", "K1", 65)])
+    set_nilai(a, 55)
+    db.commit()
+    assert kelas_stats.check(db) == []
+    assert db.get(models.KelasStats, "K1").jumlah_bsb == 0
+
+def test_pindah_kelas(db):
+    a, _ = add_students(db, [("A", "K1", 90), ("B", "K1", 65)])
+    a.kelas = "K2"
+    set_nilai(a, 75)
+    db.commit()
+    assert kelas_stats.check(db) == []
+    assert jumlah_siswa(db, "K1") == 1
+    assert jumlah_siswa(db, "K2") == 1
+
+def test_delete(db):
+    a, _ = add_students(db, [("A", "K1", 90), ("B", "K1", 65)])
+    db.delete(a)
+    db.commit()
+    assert kelas_stats.check(db) == []
+    assert jumlah_siswa(db, "K1") == 1
+
+def test_bulk_import(db):
+    mappings = [student_values(f"S{i}", f"K{i % 3}", 40 + i) for i in range(60)]
+    assert save_chunk(db, mappings) is None
+    assert kelas_stats.check(db) == []
+    assert jumlah_siswa(db, "K0") == 20
+
+def test_session_lama_tidak_mengurangi_dua_kali(db):
+    # Dua session membaca siswa yang sama sebelum salah satunya commit
+    (a,) = add_students(db, [("A", "K0", 80)])
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        first.get(models.Student, a.id).kelas = "K1"
+        stale = second.get(models.Student, a.id)
+        first.commit()
+        stale.kelas = "K2"
+        set_nilai(stale, 60)
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+    assert kelas_stats.check(db) == []
+    assert [jumlah_siswa(db, kelas) for kelas in ("K0", "K1", "K2")] == [0, 0, 1]
+
+def test_put_bersamaan(db):
+    from app.main import app
+
+    admin = models.User(username="admin", hashed_password="-", role="admin")
+    db.add(admin)
+    db.commit()
+    students = add_students(db, [(f"S{i}", "K0", 70) for i in range(3)], admin.id)
+    token = auth.create_access_token(data={"sub": "admin", "role": "admin", "uid": admin.id})
+    ids = [student.id for student in students]
+
+    async def put_all():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {token}"}
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+                return await asyncio.gather(*(
+                    client.put(f"/students/{ids[i % 3]}", json=student_values(f"S{i % 3}", f"K{i % 4}", 50 + i % 50))
+                    for i in range(60)
+                ))
+        finally:
+            # Koneksi aiosqlite memakai thread non-daemon dan terikat ke event loop ini
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    responses = asyncio.run(put_all())
+    assert [response.status_code for response in responses] == [200] * 60
+    assert kelas_stats.check(db) == []
+    assert sum(jumlah_siswa(db, f"K{i}") for i in range(4)) == 3
@@ -0,0 +1,47 @@
+# file: tests/test_listing_cache.py
+# Dua ListingCache dengan shared_file yang sama mensimulasikan dua worker gunicorn.
+from app.listing_cache import ListingCache
+
+def test_invalidate_in_one_worker_clears_the_other(tmp_path):
+    shared_file = str(tmp_path / ".kegiatan_generation")
+    worker_a = ListingCache(16, 60, shared_file=shared_file)
+    worker_b = ListingCache(16, 60, shared_file=shared_file)
+
+    worker_b.put(None, worker_b.generation, b'{"kegiatan": []}')
+    assert worker_b.get(None) is not None
+
+    worker_a.invalidate()
+    assert worker_b.get(None) is None
+
+    # Setelah sinkron, worker B kembali bisa menyimpan hasil query baru
+    worker_b.put(None, worker_b.generation, b'{"kegiatan": [1]}')
+    assert worker_b.get(None).body == b'{"kegiatan": [1]}'
+
+def test_query_started_before_remote_invalidate_is_not_cached(tmp_path):
+    shared_file = str(tmp_path / ".pengumuman_generation")
+    worker_a = ListingCache(16, 60, shared_file=shared_file)
+    worker_b = ListingCache(16, 60, shared_file=shared_file)
+
+    assert worker_b.get("I.1") is None
+    generation = worker_b.generation
+    worker_a.invalidate()  # Commit di worker lain selama query worker B berjalan
+    listing = worker_b.put("I.1", generation, b'{"pengumuman": []}')
+
+    assert listing.body == b'{"pengumuman": []}'
+    assert worker_b.get("I.1") is None
+
+def test_consecutive_invalidations_are_all_seen(tmp_path):
+    shared_file = str(tmp_path / ".kegiatan_generation")
+    worker_a = ListingCache(16, 60, shared_file=shared_file)
+    worker_b = ListingCache(16, 60, shared_file=shared_file)
+
+    for i in range(20):
+        worker_b.put(None, worker_b.generation, b"%d" % i)
+        worker_a.invalidate()
+        assert worker_b.get(None) is None
+
+def test_invalidating_worker_keeps_caching(tmp_path):
+    worker = ListingCache(16, 60, shared_file=str(tmp_path / ".kegiatan_generation"))
+    worker.invalidate()
+    worker.put(None, worker.generation, b"{}")
+    assert worker.get(None) is not None
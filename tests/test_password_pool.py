@@ -0,0 +1,31 @@
+# file: tests/test_password_pool.py
+import asyncio
+import os
+
+from app import password_pool
+from app.password_pool import PasswordPool
+
+def test_init_worker_tanpa_os_nice(monkeypatch):
+    # Windows tidak punya os.nice
+    monkeypatch.delattr(os, "nice", raising=False)
+    password_pool._init_worker(10)
+
+def test_init_worker_menurunkan_prioritas(monkeypatch):
+    calls = []
+    monkeypatch.setattr(os, "nice", calls.append, raising=False)
+    password_pool._init_worker(10)
+    password_pool._init_worker(0)
+    assert calls == [10]
+
+def test_hash_dan_verify_di_process_pool():
+    pool = PasswordPool(1, 4, 30, nice=5)
+
+    async def scenario():
+        hashed = await pool.hash("rahasia123")
+        return await pool.verify("rahasia123", hashed), await pool.verify("salah", hashed)
+
+    try:
+        assert asyncio.run(scenario()) == (True, False)
+    finally:
+        pool.shutdown()
+    assert pool.in_flight == 0
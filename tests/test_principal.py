@@ -0,0 +1,56 @@
+# file: tests/test_principal.py
+from app import models
+from app.principal import Principal, user_cache
+
+def _add_user(db, username="ortu1", role="orang_tua"):
+    user = models.User(username=username, hashed_password="x", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+def test_update_invalidates_after_commit(db):
+    user = _add_user(db)
+    stale = Principal.from_user(user)
+
+    user.role = "admin"
+    db.flush()
+    # Request lain membaca baris lama sebelum commit dan menaruhnya ke cache
+    user_cache.put("ortu1", stale)
+    assert user_cache.get("ortu1") is stale
+
+    db.commit()
+    assert user_cache.get("ortu1") is None
+
+def test_rename_invalidates_old_and_new_username(db):
+    user = _add_user(db)
+    user_cache.put("ortu1", Principal.from_user(user))
+    user_cache.put("ortu2", Principal(id=None, username="ortu2", role="orang_tua"))
+
+    user.username = "ortu2"
+    db.commit()
+    assert user_cache.get("ortu1") is None
+    assert user_cache.get("ortu2") is None
+
+def test_delete_invalidates_after_commit(db):
+    user = _add_user(db)
+    user_cache.put("ortu1", Principal.from_user(user))
+
+    db.delete(user)
+    db.flush()
+    assert user_cache.get("ortu1") is not None
+
+    db.commit()
+    assert user_cache.get("ortu1") is None
+
+def test_rollback_keeps_cache(db):
+    user = _add_user(db)
+    principal = Principal.from_user(user)
+    user_cache.put("ortu1", principal)
+
+    user.role = "admin"
+    db.flush()
+    db.rollback()
+    # Commit berikutnya yang tidak mengubah ortu1 tidak ikut meng-invalidasi ortu1
+    _add_user(db, username="ortu3")
+    assert user_cache.get("ortu1") is principal
+    user_cache.pop("ortu1")